@@ -4,3 +4,127 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# Ingestion batching
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "256"))
+
+# Bulk ingestion
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+INGEST_MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", "data/ingest_manifest.json")
+
+# PDF extraction
+PDF_PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", "1"))
+
+# Page-selective OCR fallback
+OCR_MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "40"))
+OCR_MAX_PAGES_PER_REQUEST = int(os.getenv("OCR_MAX_PAGES_PER_REQUEST", "10"))
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", "4"))
+OCR_FILE_API = os.getenv("OCR_FILE_API", "gemini")
+
+# Extracted-text cache
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH", "data/extraction_cache.sqlite")
+
+# Chunking (all-MiniLM-L6-v2 truncates at 256 tokens incl. special tokens)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "240"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+CHUNK_MIN_CHARS = int(os.getenv("CHUNK_MIN_CHARS", "100"))
+
+# Background ingestion jobs
+INGEST_JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "1"))
+INGEST_JOB_QUEUE_LIMIT = int(os.getenv("INGEST_JOB_QUEUE_LIMIT", "20"))
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "200"))
+INGEST_UPLOAD_DIR = os.getenv("INGEST_UPLOAD_DIR", "data/uploads")
+INGEST_JOB_DB_PATH = os.getenv("INGEST_JOB_DB_PATH", "data/ingest_jobs.sqlite")
+INGEST_JOB_RUNNER = os.getenv("INGEST_JOB_RUNNER", "inline").lower()
+INGEST_JOB_POLL_SECONDS = float(os.getenv("INGEST_JOB_POLL_SECONDS", "1"))
+# Each job-running process renews a lease; jobs of a process whose lease
+# lapsed are failed (running) or taken over (queued)
+INGEST_JOB_HEARTBEAT_SECONDS = float(os.getenv("INGEST_JOB_HEARTBEAT_SECONDS", "10"))
+INGEST_JOB_LEASE_SECONDS = float(os.getenv("INGEST_JOB_LEASE_SECONDS", "60"))
+
+# Query embedding cache
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "10000"))
+EMBED_CACHE_TTL_SECONDS = float(os.getenv("EMBED_CACHE_TTL_SECONDS", "0"))
+# auto: casefold only for known uncased models (see app/embeddings/cache.py)
+EMBED_CACHE_CASEFOLD = os.getenv("EMBED_CACHE_CASEFOLD", "auto").lower()
+
+# Micro-batching of concurrent query embeddings
+EMBED_MICROBATCH_ENABLED = os.getenv("EMBED_MICROBATCH_ENABLED", "true").lower() == "true"
+EMBED_MICROBATCH_MAX_SIZE = int(os.getenv("EMBED_MICROBATCH_MAX_SIZE", "32"))
+EMBED_MICROBATCH_MAX_WAIT_MS = float(os.getenv("EMBED_MICROBATCH_MAX_WAIT_MS", "5"))
+
+# Embedding backend: torch | int8 | onnx | onnx-int8
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "data/onnx")
+EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", "256"))
+
+# Shared embedding server (empty = load the model in every worker)
+EMBEDDING_SOCKET = os.getenv("EMBEDDING_SOCKET", "")
+EMBEDDING_SOCKET_TIMEOUT = float(os.getenv("EMBEDDING_SOCKET_TIMEOUT", "30"))
+
+# Startup
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+
+# Grade/subject/chapter catalog
+CATALOG_PATH = os.getenv("CATALOG_PATH", "data/catalog.json")
+
+# Retrieval
+SEARCH_SCORE_THRESHOLD = float(os.getenv("SEARCH_SCORE_THRESHOLD", "0")) or None
+
+# Async request pipeline
+QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", "100"))
+EMBED_EXECUTOR_WORKERS = int(os.getenv("EMBED_EXECUTOR_WORKERS", "2"))
+
+# Qdrant collection tuning: default | compact | binary (see app/vectorstore/profiles.py)
+QDRANT_PROFILE = os.getenv("QDRANT_PROFILE", "default").lower()
+
+# Vector store: qdrant | local (in-process NumPy index under LOCAL_INDEX_DIR)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "data/local_index")
+LOCAL_INDEX_RETIRE_SECONDS = float(os.getenv("LOCAL_INDEX_RETIRE_SECONDS", "300"))
+
+# Embedding snapshots
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "data/snapshots")
+SNAPSHOT_BATCH_SIZE = int(os.getenv("SNAPSHOT_BATCH_SIZE", "1024"))
+SNAPSHOT_UPLOAD_WORKERS = int(os.getenv("SNAPSHOT_UPLOAD_WORKERS", "4"))
+
+# Retrieval result cache (invalidated per grade by the catalog generation)
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "5000"))
+RETRIEVAL_CACHE_MAX_BYTES = int(os.getenv("RETRIEVAL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RETRIEVAL_CACHE_TTL_SECONDS = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "900"))
+
+# LLM gateway: gemini | local (offline stand-in for load tests)
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+LLM_TRANSPORT = os.getenv("LLM_TRANSPORT", "gemini").lower()
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "100"))
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+LLM_LOCAL_LATENCY_MS = float(os.getenv("LLM_LOCAL_LATENCY_MS", "0"))
+
+# Semantic /ask answer cache (per node; the TTL bounds staleness across nodes)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+SEMANTIC_CACHE_BUCKET_SIZE = int(os.getenv("SEMANTIC_CACHE_BUCKET_SIZE", "256"))
+SEMANTIC_CACHE_MAX_BUCKETS = int(os.getenv("SEMANTIC_CACHE_MAX_BUCKETS", "2000"))
+
+# Per-chapter question bank
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", "data/question_bank.sqlite")
+QUESTION_BANK_TARGET = int(os.getenv("QUESTION_BANK_TARGET", "150"))
+QUESTION_BANK_LOW_WATER = int(os.getenv("QUESTION_BANK_LOW_WATER", "40"))
+QUESTION_BANK_BATCH_SIZE = int(os.getenv("QUESTION_BANK_BATCH_SIZE", "15"))
+QUESTION_BANK_WORKERS = int(os.getenv("QUESTION_BANK_WORKERS", "1"))
+# How long a served question counts as "seen" by a student
+QUESTION_BANK_SERVED_DAYS = float(os.getenv("QUESTION_BANK_SERVED_DAYS", "90"))
+
+# Sharded generation of large mock tests / question papers
+GENERATION_SHARD_SIZE = int(os.getenv("GENERATION_SHARD_SIZE", "10"))
+GENERATION_SHARD_RETRIES = int(os.getenv("GENERATION_SHARD_RETRIES", "2"))
+GENERATION_SHARD_CONCURRENCY = int(os.getenv("GENERATION_SHARD_CONCURRENCY", "5"))
+GENERATION_MAX_QUESTIONS = int(os.getenv("GENERATION_MAX_QUESTIONS", "100"))
+# Retrieval hits and context characters shared by all shards of one request
+GENERATION_CONTEXT_LIMIT = int(os.getenv("GENERATION_CONTEXT_LIMIT", "30"))
+GENERATION_CONTEXT_CHARS = int(os.getenv("GENERATION_CONTEXT_CHARS", "12000"))
@@ -0,0 +1,210 @@
+import os
+import socket
+import threading
+import numpy as np
+from app.config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_BACKEND,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_MAX_SEQ_LENGTH,
+    EMBEDDING_SOCKET,
+    EMBEDDING_SOCKET_TIMEOUT
+)
+from app.embeddings.protocol import send_json, recv_vectors
+
+# Every backend exposes encode(texts, batch_size) -> float32 [n, dim],
+# L2-normalized like the sentence-transformers pipeline for MiniLM.
+
+
+# --------------------------------------------------
+# TORCH (reference)
+# --------------------------------------------------
+
+class TorchBackend:
+
+    name = "torch"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def encode(self, texts: list, batch_size: int = 32):
+        vectors = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return vectors.astype(np.float32)
+
+
+# --------------------------------------------------
+# TORCH DYNAMIC INT8
+# --------------------------------------------------
+
+class Int8Backend(TorchBackend):
+
+    name = "int8"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        super().__init__(model_name)
+        import torch
+        # Linear layers carry almost all of MiniLM's weights and FLOPs
+        self.model = torch.quantization.quantize_dynamic(
+            self.model,
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+
+
+# --------------------------------------------------
+# ONNX RUNTIME (fp32 or dynamically quantized int8)
+# --------------------------------------------------
+
+class OnnxBackend:
+
+    name = "onnx"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, quantize: bool = False):
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError:
+            raise Exception(
+                "ONNX backend requires `pip install onnxruntime optimum[onnxruntime]`"
+            )
+
+        if quantize:
+            self.name = "onnx-int8"
+
+        model_path = _onnx_model_path(model_name, quantize)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(model_path))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: list, batch_size: int = 32):
+        outputs = []
+
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+
+            tokens = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=EMBEDDING_MAX_SEQ_LENGTH,
+                return_tensors="np"
+            )
+            feeds = {
+                name: value.astype(np.int64)
+                for name, value in tokens.items()
+                if name in self.input_names
+            }
+
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens, then L2 normalize
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            outputs.append(pooled / np.clip(norms, 1e-12, None))
+
+        return np.vstack(outputs).astype(np.float32)
+
+
+def _onnx_model_path(model_name: str, quantize: bool):
+
+    export_dir = os.path.join(EMBEDDING_ONNX_DIR, model_name)
+    fp32_path = os.path.join(export_dir, "model.onnx")
+    int8_path = os.path.join(export_dir, "model_int8.onnx")
+
+    if not os.path.exists(fp32_path):
+        print(f"Exporting {model_name} to ONNX...")
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        hub_name = f"sentence-transformers/{model_name}"
+        ORTModelForFeatureExtraction.from_pretrained(hub_name, export=True).save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(hub_name).save_pretrained(export_dir)
+
+    if not quantize:
+        return fp32_path
+
+    if not os.path.exists(int8_path):
+        print(f"Quantizing {model_name} ONNX model to int8...")
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    return int8_path
+
+
+# --------------------------------------------------
+# REMOTE (shared embedding server over a Unix socket)
+# --------------------------------------------------
+
+class RemoteBackend:
+
+    name = "remote"
+
+    def __init__(self, socket_path: str = EMBEDDING_SOCKET, timeout: float = EMBEDDING_SOCKET_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        # One persistent connection per calling thread
+        self._local = threading.local()
+
+    def _connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def encode(self, texts: list, batch_size: int = 32):
+        # Retry once on a fresh connection in case the server restarted
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                send_json(sock, {"texts": list(texts), "batch_size": batch_size})
+                return recv_vectors(sock)
+            except (ConnectionError, OSError):
+                self._reset()
+                if attempt:
+                    raise
+
+
+# --------------------------------------------------
+# FACTORY
+# --------------------------------------------------
+
+def load_backend(name: str = EMBEDDING_BACKEND, model_name: str = EMBEDDING_MODEL):
+
+    if name == "remote":
+        return RemoteBackend()
+    if name == "torch":
+        return TorchBackend(model_name)
+    if name == "int8":
+        return Int8Backend(model_name)
+    if name == "onnx":
+        return OnnxBackend(model_name)
+    if name == "onnx-int8":
+        return OnnxBackend(model_name, quantize=True)
+
+    raise Exception(f"Unknown embedding backend: {name}")
@@ -0,0 +1,91 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from app.config import EMBED_MICROBATCH_MAX_SIZE, EMBED_MICROBATCH_MAX_WAIT_MS
+
+
+class EmbeddingBatcher:
+
+    # Requests arriving within max_wait_ms of the first queued one are
+    # encoded together in a single encode_fn(list_of_texts) call.
+    def __init__(
+        self,
+        encode_fn,
+        max_batch_size: int = EMBED_MICROBATCH_MAX_SIZE,
+        max_wait_ms: float = EMBED_MICROBATCH_MAX_WAIT_MS
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so a forked worker starts its own
+        with self._lock:
+            if self._worker is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="embedding-batcher",
+                    daemon=True
+                )
+                self._worker.start()
+
+    def submit(self, text: str):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str):
+        return self.submit(text).result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for text, _ in batch]
+
+            try:
+                vectors = self.encode_fn(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0
+        }
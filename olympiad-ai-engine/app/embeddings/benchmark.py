@@ -0,0 +1,208 @@
+import sys
+import json
+import queue
+import time
+import argparse
+import resource
+import multiprocessing
+import numpy as np
+
+# Parity + latency/RSS comparison of embedding backends.
+#
+#   python -m app.embeddings.benchmark --backends torch int8 onnx onnx-int8
+#
+# Each backend runs in its own spawned process so RSS numbers are not
+# polluted by the others.
+
+SAMPLE_TEXTS = [
+    "What is the difference between speed and velocity?",
+    "Explain photosynthesis with a labelled diagram.",
+    "Find the LCM of 12, 18 and 30.",
+    "Which of the following animals is a mammal: frog, whale, snake or crocodile?",
+    "A train travels 120 km in 2 hours. What is its average speed?",
+    "State Newton's third law of motion with an example.",
+    "What are the three states of matter?",
+    "If 3x + 5 = 20, find the value of x.",
+    "Identify the odd one out: square, rectangle, triangle, cube.",
+    "Choose the correct synonym of the word 'abundant'.",
+    "Why do we see lightning before we hear thunder?",
+    "What is the function of chlorophyll in plants?",
+]
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def _run_backend(name: str, texts: list, repeats: int, batch_size: int, out_queue):
+
+    try:
+        _measure_backend(name, texts, repeats, batch_size, out_queue)
+    except Exception as e:
+        out_queue.put({"backend": name, "error": f"{type(e).__name__}: {e}"})
+
+
+def _measure_backend(name: str, texts: list, repeats: int, batch_size: int, out_queue):
+
+    from app.embeddings.backends import load_backend
+
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    backend = load_backend(name)
+    load_seconds = time.perf_counter() - started
+
+    # Warm up kernels / allocator before timing
+    backend.encode(texts[:2], batch_size=2)
+
+    single = []
+    for _ in range(repeats):
+        for text in texts:
+            t0 = time.perf_counter()
+            backend.encode([text], batch_size=1)
+            single.append((time.perf_counter() - t0) * 1000.0)
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        vectors = backend.encode(texts, batch_size=batch_size)
+    batch_seconds = time.perf_counter() - t0
+
+    out_queue.put({
+        "backend": name,
+        "load_seconds": round(load_seconds, 2),
+        "rss_mb": round(_rss_mb() - rss_before, 1),
+        "single_p50_ms": round(_percentile(single, 0.50), 2),
+        "single_p95_ms": round(_percentile(single, 0.95), 2),
+        "batch_texts_per_sec": round(len(texts) * repeats / batch_seconds, 1),
+        "vectors": vectors.tolist()
+    })
+
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray):
+
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosines = (reference * candidate).sum(axis=1)
+
+    return {
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "min_cosine": round(float(cosines.min()), 5)
+    }
+
+
+def _run_isolated(ctx, name: str, texts: list, repeats: int, batch_size: int, timeout: float):
+
+    # A crashed child (OOM kill, native abort) never puts a result, so poll
+    # the queue and give up once the process is gone or the timeout passes
+    out_queue = ctx.Queue()
+    proc = ctx.Process(target=_run_backend, args=(name, texts, repeats, batch_size, out_queue))
+    proc.start()
+
+    deadline = time.monotonic() + timeout
+    result = None
+
+    try:
+        while result is None:
+            try:
+                result = out_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not proc.is_alive():
+                    # One last look: the result may have landed as it exited
+                    try:
+                        result = out_queue.get(timeout=1.0)
+                    except queue.Empty:
+                        result = {"backend": name, "error": f"process exited with code {proc.exitcode}"}
+                elif time.monotonic() > deadline:
+                    result = {"backend": name, "error": f"timed out after {timeout:.0f}s"}
+    finally:
+        proc.join(timeout=0 if result is None or "error" in result else 5)
+        if proc.is_alive():
+            proc.kill()
+            proc.join()
+
+    return result
+
+
+def run_benchmark(
+    backends: list,
+    texts: list = SAMPLE_TEXTS,
+    repeats: int = 5,
+    batch_size: int = 32,
+    timeout: float = 600.0
+):
+
+    ctx = multiprocessing.get_context("spawn")
+    results = [
+        _run_isolated(ctx, name, texts, repeats, batch_size, timeout)
+        for name in backends
+    ]
+
+    # Parity is always measured against the torch reference vectors
+    reference = next((r for r in results if r["backend"] == "torch"), None)
+    if reference is None:
+        reference = _run_isolated(ctx, "torch", texts, 1, batch_size, timeout)
+
+    if "error" in reference:
+        raise Exception(f"torch reference backend failed: {reference['error']}")
+
+    reference_vectors = np.asarray(reference["vectors"], dtype=np.float32)
+
+    for result in results:
+        if "error" in result:
+            continue
+        vectors = np.asarray(result.pop("vectors"), dtype=np.float32)
+        result.update(cosine_parity(reference_vectors, vectors))
+
+    return results
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Compare embedding backends")
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx", "onnx-int8"])
+    parser.add_argument("--texts-file", help="One text per line; defaults to built-in samples")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=600.0,
+                        help="Seconds to wait for each backend's process")
+    parser.add_argument("--min-cosine", type=float, default=0.99,
+                        help="Exit non-zero if any backend's min cosine falls below this")
+    args = parser.parse_args()
+
+    texts = SAMPLE_TEXTS
+    if args.texts_file:
+        with open(args.texts_file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    results = run_benchmark(args.backends, texts, args.repeats, args.batch_size, args.timeout)
+
+    print(json.dumps(results, indent=2))
+
+    crashed = [r["backend"] for r in results if "error" in r]
+    if crashed:
+        print(f"❌ Backends failed to run: {', '.join(crashed)}")
+        sys.exit(1)
+
+    failing = [r["backend"] for r in results if r["min_cosine"] < args.min_cosine]
+    if failing:
+        print(f"❌ Parity below {args.min_cosine}: {', '.join(failing)}")
+        sys.exit(1)
+
+    print("✅ All backends within parity threshold")
+
+
+if __name__ == "__main__":
+    main()
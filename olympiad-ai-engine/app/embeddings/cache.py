@@ -0,0 +1,99 @@
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from app.config import (
+    EMBED_CACHE_SIZE,
+    EMBED_CACHE_TTL_SECONDS,
+    EMBED_CACHE_CASEFOLD,
+    EMBEDDING_MODEL
+)
+
+# Models whose tokenizer lowercases input, so case never changes the vector
+UNCASED_MODELS = {
+    "all-MiniLM-L6-v2",
+    "all-MiniLM-L12-v2",
+    "paraphrase-MiniLM-L6-v2",
+    "multi-qa-MiniLM-L6-cos-v1"
+}
+
+
+def _casefold_enabled(setting: str = EMBED_CACHE_CASEFOLD, model: str = EMBEDDING_MODEL):
+    if setting == "auto":
+        return model.split("/")[-1] in UNCASED_MODELS
+    return setting == "true"
+
+
+CASEFOLD = _casefold_enabled()
+
+
+def normalize_text(text: str, casefold: bool = CASEFOLD):
+    # Whitespace never changes the tokens; case only for uncased models
+    text = " ".join(text.split())
+    return text.casefold() if casefold else text
+
+
+def cache_key(text: str, casefold: bool = CASEFOLD, model: str = EMBEDDING_MODEL):
+    # Model and normalization are part of the key, so switching either
+    # never serves a vector computed under the other
+    return f"{model}|{'cf' if casefold else 'cs'}|{normalize_text(text, casefold)}"
+
+
+class EmbeddingCache:
+
+    # Bounded LRU of normalized text -> float32 vector, with optional TTL
+    def __init__(self, max_entries: int = EMBED_CACHE_SIZE, ttl_seconds: float = EMBED_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                vector, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, vector):
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        vector = np.asarray(vector, dtype=np.float32)
+
+        with self._lock:
+            self._entries[key] = (vector, expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
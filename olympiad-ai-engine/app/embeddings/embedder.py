@@ -1,14 +1,78 @@
-from sentence_transformers import SentenceTransformer
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from app.config import (
+    EMBED_BATCH_SIZE,
+    EMBEDDING_BACKEND,
+    EMBED_MICROBATCH_ENABLED,
+    EMBEDDING_SOCKET,
+    EMBED_EXECUTOR_WORKERS
+)
+from app.embeddings.backends import load_backend
+from app.embeddings.cache import EmbeddingCache, cache_key
+from app.embeddings.batcher import EmbeddingBatcher
 
 _model = None
+_cache = EmbeddingCache()
 
 def get_model():
     global _model
     if _model is None:
-        print("Loading embedding model...")
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
+        if EMBEDDING_SOCKET:
+            # Model lives in the shared embedding server process
+            print(f"Using embedding server at {EMBEDDING_SOCKET}")
+            _model = load_backend("remote")
+        else:
+            print(f"Loading embedding model ({EMBEDDING_BACKEND} backend)...")
+            _model = load_backend(EMBEDDING_BACKEND)
     return _model
 
+def _encode_batch(texts: list):
+    return get_model().encode(texts, batch_size=len(texts))
+
+# Concurrent request threads share one batched encode call
+_batcher = EmbeddingBatcher(_encode_batch)
+
+# Dedicated threads for CPU embedding work from async endpoints, so it
+# never runs on (or starves) the event loop or the default threadpool
+_executor = ThreadPoolExecutor(
+    max_workers=EMBED_EXECUTOR_WORKERS,
+    thread_name_prefix="embedding"
+)
+
 def generate_embedding(text: str):
-    model = get_model()
-    return model.encode(text).tolist()
\ No newline at end of file
+    key = cache_key(text)
+
+    vector = _cache.get(key)
+    if vector is None:
+        if EMBED_MICROBATCH_ENABLED:
+            vector = _batcher.embed(text)
+        else:
+            vector = _encode_batch([text])[0]
+        _cache.put(key, vector)
+
+    return vector.tolist()
+
+async def generate_embedding_async(text: str):
+    key = cache_key(text)
+
+    vector = _cache.get(key)
+    if vector is None:
+        if EMBED_MICROBATCH_ENABLED:
+            # The batcher thread does the encode; just await its future
+            vector = await asyncio.wrap_future(_batcher.submit(text))
+        else:
+            loop = asyncio.get_running_loop()
+            vector = (await loop.run_in_executor(_executor, _encode_batch, [text]))[0]
+        _cache.put(key, vector)
+
+    return vector.tolist()
+
+def generate_embeddings(texts: list, batch_size: int = EMBED_BATCH_SIZE):
+    # One forward pass per batch instead of one per text
+    return get_model().encode(texts, batch_size=batch_size).tolist()
+
+def embedding_cache_stats():
+    return _cache.stats()
+
+def embedding_batcher_stats():
+    return _batcher.stats()
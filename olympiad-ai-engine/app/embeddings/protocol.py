@@ -0,0 +1,60 @@
+import json
+import struct
+import numpy as np
+
+# Wire format shared by the embedding server and its clients:
+#   request  = frame(json {"texts": [...], "batch_size": n})  batch_size optional
+#   response = frame(json {"shape": [n, dim]}) + n*dim float32 bytes
+#              or frame(json {"error": "..."})
+# where frame(x) = 4-byte big-endian length + x.
+
+_LENGTH = struct.Struct(">I")
+
+
+def _recv_exact(sock, size: int):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ConnectionError("Embedding socket closed")
+        received += n
+
+    return bytes(buffer)
+
+
+def send_frame(sock, payload: bytes):
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def recv_frame(sock):
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return _recv_exact(sock, size)
+
+
+def send_json(sock, message: dict):
+    send_frame(sock, json.dumps(message).encode("utf-8"))
+
+
+def recv_json(sock):
+    return json.loads(recv_frame(sock))
+
+
+def send_vectors(sock, vectors: np.ndarray):
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    send_json(sock, {"shape": list(vectors.shape)})
+    sock.sendall(vectors.tobytes())
+
+
+def recv_vectors(sock):
+    header = recv_json(sock)
+
+    if "error" in header:
+        raise Exception(f"Embedding server error: {header['error']}")
+
+    rows, dim = header["shape"]
+    body = _recv_exact(sock, rows * dim * 4)
+
+    return np.frombuffer(body, dtype=np.float32).reshape(rows, dim)
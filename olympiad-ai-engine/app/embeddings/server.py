@@ -0,0 +1,102 @@
+import os
+import argparse
+import threading
+import socketserver
+import numpy as np
+from app.config import EMBEDDING_SOCKET, EMBEDDING_BACKEND, EMBED_BATCH_SIZE
+from app.embeddings.backends import load_backend
+from app.embeddings.batcher import EmbeddingBatcher
+from app.embeddings.protocol import recv_json, send_json, send_vectors
+
+# One process owns the embedding model; every gunicorn/uvicorn worker talks
+# to it over a Unix socket (EMBEDDING_SOCKET). Single-text requests (queries)
+# from all workers go through one micro-batcher, so concurrent queries share
+# forward passes; so do small multi-text requests. Large requests (ingest)
+# are already batches and are encoded directly in sub-batches, taking the
+# bulk lock per sub-batch so queries and other ingests interleave.
+#
+#   python -m app.embeddings.server --socket /tmp/olympiad-embed.sock
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        # Connections are persistent: serve requests until the client hangs up
+        while True:
+            try:
+                request = recv_json(self.request)
+            except (ConnectionError, OSError):
+                return
+
+            try:
+                vectors = self.server.encode(request["texts"], request.get("batch_size"))
+            except Exception as e:
+                send_json(self.request, {"error": str(e)})
+                continue
+
+            send_vectors(self.request, vectors)
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, backend_name: str = EMBEDDING_BACKEND):
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+        print(f"Loading embedding model ({backend_name} backend)...")
+        backend = load_backend(backend_name)
+
+        self.backend = backend
+        self.batcher = EmbeddingBatcher(
+            lambda texts: backend.encode(texts, batch_size=len(texts))
+        )
+        self._bulk_lock = threading.Lock()
+
+        # Warm up before accepting connections; the first encode pays kernel setup
+        self.batcher.embed("warmup")
+
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o660)
+
+    def encode(self, texts: list, batch_size: int = None):
+
+        # Small requests (a worker's own query micro-batch) share the query
+        # path and never wait behind an ingest
+        if len(texts) <= self.batcher.max_batch_size:
+            futures = [self.batcher.submit(text) for text in texts]
+            return np.vstack([future.result() for future in futures])
+
+        batch_size = batch_size or EMBED_BATCH_SIZE
+        parts = []
+
+        for start in range(0, len(texts), batch_size):
+            # Held per sub-batch, so concurrent ingests take turns
+            with self._bulk_lock:
+                parts.append(self.backend.encode(texts[start:start + batch_size], batch_size=batch_size))
+
+        return np.vstack(parts)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Shared embedding server")
+    parser.add_argument("--socket", default=EMBEDDING_SOCKET or "/tmp/olympiad-embed.sock")
+    parser.add_argument("--backend", default=EMBEDDING_BACKEND)
+    args = parser.parse_args()
+
+    server = EmbeddingServer(args.socket, args.backend)
+    print(f"✅ Embedding server listening on {args.socket}")
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,61 @@
+import time
+_import_started = time.perf_counter()
+
 from dotenv import load_dotenv
 load_dotenv()
 import os
+import json
+import asyncio
 import uuid
-from fastapi import FastAPI, Request
+import shutil
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from app.services.question_paper_modify_engine import regenerate_question_paper_with_modifications
-from app.vectorstore.qdrant_client import client, search_similar
-#from app.vectorstore.qdrant_client import get_client, search_similar
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from app.vectorstore.async_qdrant_client import close_async_client
+from app.vectorstore.retrieval_cache import search_similar_cached_async, retrieval_cache_stats
+from app.vectorstore.catalog import list_grades, list_subjects, list_chapters
 from app.models.request_models import AskRequest
+from app.models.ingest_models import BulkIngestRequest
 from app.models.mock_models import (
     MockRequest,
     SubmissionRequest,
     QuestionPaperRequest
 )
-from app.embeddings.embedder import generate_embedding
-from app.services.planner_engine import generate_llm_plan
-from app.services.qa_engine import generate_answer
-from app.services.mock_engine import generate_mock_exam_llm
-from app.services.deterministic_mock_engine import generate_mock_exam as generate_fallback_mock
-from app.services.question_paper_engine import generate_question_paper_llm
-from app.services.pdf_exam_generator import generate_question_paper_pdf
-from qdrant_client.models import Filter, FieldCondition, MatchValue
+from app.embeddings.embedder import (
+    generate_embedding_async,
+    embedding_cache_stats,
+    embedding_batcher_stats
+)
+from app.services.ingest_jobs import (
+    submit_job,
+    get_job,
+    list_jobs,
+    start_job_runner,
+    IngestQueueFull
+)
+from app.services.warmup import start_warmup, readiness
+from app.services.llm_gateway import llm_stats, close_client as close_llm_client
+from app.services.answer_cache import lookup_answer_async, store_answer, answer_cache_stats
+from app.services.question_bank import sample_questions, add_questions, bank_counts
+from app.services.sharded_generation import shard_count, IncompleteGeneration
+from app.config import INGEST_UPLOAD_DIR, GENERATION_CONTEXT_LIMIT, GENERATION_CONTEXT_CHARS
+
+# LLM engines (google-genai), reportlab, qdrant_client and the embedding
+# model are imported inside the endpoints that use them, so importing
+# this module stays cheap and the model loads during warmup instead.
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_warmup()
+    start_job_runner()
+    yield
+    await close_async_client()
+    await close_llm_client()
 
-app = FastAPI(title="Olympiad Mastery AI Engine")
+
+app = FastAPI(title="Olympiad Mastery AI Engine", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -43,12 +74,28 @@ def root():
     return {"message": "Olympiad AI Engine Running Successfully"}
 
 
+# --------------------------------------------------
+# READINESS
+# --------------------------------------------------
+
+@app.get("/ready")
+def ready():
+
+    state = readiness()
+    state["import_seconds"] = IMPORT_SECONDS
+
+    return JSONResponse(
+        status_code=200 if state["ready"] else 503,
+        content=state
+    )
+
+
 # --------------------------------------------------
 # ASK ENDPOINT
 # --------------------------------------------------
 
 @app.post("/ask/")
-def ask_question(request: AskRequest):
+async def ask_question(request: AskRequest):
 
     user_query = request.question.lower()
 
@@ -59,10 +106,19 @@ def ask_question(request: AskRequest):
             "message": "Please configure your question paper."
         }
 
+    from app.services.qa_engine import generate_answer_async, is_error_answer
+
     # Normal QA
-    query_vector = generate_embedding(request.question)
+    query_vector = await generate_embedding_async(request.question)
+
+    # A near-identical question about this chapter was already answered
+    cached, generation = await lookup_answer_async(
+        request.grade, request.subject, request.chapter_name, request.question, query_vector
+    )
+    if cached is not None:
+        return {"type": "text", "message": cached["answer"]}
 
-    results = search_similar(
+    results = await search_similar_cached_async(
         grade=request.grade,
         subject=request.subject,
         chapter_name=request.chapter_name,
@@ -71,35 +127,210 @@ def ask_question(request: AskRequest):
     )
 
     context_text = "\n\n".join(
-        [r["content"] for r in results]
+        [r.content for r in results]
     )[:4000]
 
-    answer = generate_answer(context_text, request.question)
+    answer = await generate_answer_async(context_text, request.question)
+
+    if not is_error_answer(answer):
+        store_answer(
+            request.grade, request.subject, request.chapter_name, request.question, query_vector,
+            generation, answer, [{"id": r.id, "score": round(r.score, 4)} for r in results]
+        )
 
     return {"type": "text", "message": answer}
 
 
+# --------------------------------------------------
+# ASK ENDPOINT (STREAMING, SERVER-SENT EVENTS)
+# --------------------------------------------------
+
+def _sse(event: str, data: dict):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: AskRequest, http_request: Request):
+
+    # Events: "retrieval" (sources) first, then "token" chunks, then "done".
+    # The non-streaming /ask/ contract is unchanged for older clients.
+
+    if "question paper" in request.question.lower():
+        async def setup_events():
+            yield _sse("message", {
+                "type": "question_paper_setup",
+                "message": "Please configure your question paper."
+            })
+            yield _sse("done", {})
+        return StreamingResponse(setup_events(), media_type="text/event-stream")
+
+    from app.services.qa_engine import stream_answer_async, is_error_answer
+
+    query_vector = await generate_embedding_async(request.question)
+
+    cached, generation = await lookup_answer_async(
+        request.grade, request.subject, request.chapter_name, request.question, query_vector
+    )
+    if cached is not None:
+        async def cached_events():
+            yield _sse("retrieval", {
+                "grade": request.grade,
+                "subject": request.subject,
+                "chapter_name": request.chapter_name,
+                "sources": cached["sources"],
+                "cached": True
+            })
+            yield _sse("token", {"text": cached["answer"]})
+            yield _sse("done", {})
+        return StreamingResponse(cached_events(), media_type="text/event-stream")
+
+    results = await search_similar_cached_async(
+        grade=request.grade,
+        subject=request.subject,
+        chapter_name=request.chapter_name,
+        query_vector=query_vector,
+        limit=5
+    )
+
+    context_text = "\n\n".join(
+        [r.content for r in results]
+    )[:4000]
+
+    sources = [{"id": r.id, "score": round(r.score, 4)} for r in results]
+
+    async def events():
+        yield _sse("retrieval", {
+            "grade": request.grade,
+            "subject": request.subject,
+            "chapter_name": request.chapter_name,
+            "sources": sources
+        })
+
+        answer = stream_answer_async(context_text, request.question)
+        chunks = []
+        try:
+            async for chunk in answer:
+                # Stop generating (and close the Gemini stream) once the student leaves
+                if await http_request.is_disconnected():
+                    break
+                chunks.append(chunk)
+                yield _sse("token", {"text": chunk})
+            else:
+                text = "".join(chunks).strip()
+                if not is_error_answer(text):
+                    store_answer(
+                        request.grade, request.subject, request.chapter_name,
+                        request.question, query_vector, generation, text, sources
+                    )
+                yield _sse("done", {})
+        finally:
+            await answer.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # --------------------------------------------------
 # GENERATE MOCK TEST
 # --------------------------------------------------
 
+async def _keep_partial(request, questions: list, difficulty: str = "medium"):
+    # Generated questions warm the bank even when the set came back short
+    await asyncio.to_thread(
+        add_questions,
+        request.grade,
+        request.subject,
+        request.chapter_name,
+        questions,
+        difficulty
+    )
+
+
+async def _fill_questions(request, generated: list, difficulty: str = None):
+
+    from app.services.mock_engine import generate_fallback_mock
+
+    # A short or failed LLM set is completed from the chapter's bank, then
+    # with fallback questions, so a paper always has the requested length
+    await _keep_partial(request, generated, difficulty or "medium")
+
+    missing = request.number_of_questions - len(generated)
+
+    bank = await asyncio.to_thread(
+        sample_questions,
+        request.grade,
+        request.subject,
+        request.chapter_name,
+        missing,
+        request.student_id,
+        difficulty,
+        partial=True,
+        exclude=[q["question"] for q in generated]
+    )
+
+    filler = generate_fallback_mock(
+        chapter_name=request.chapter_name,
+        num_questions=missing - len(bank),
+        duration_minutes=request.duration_minutes,
+        grade=request.grade,
+        subject=request.subject
+    )["questions"]
+
+    print(f"⚠️ Filled {request.number_of_questions} questions: {len(generated)} generated, {len(bank)} from bank, {len(filler)} fallback")
+
+    return [{**q, "id": i + 1} for i, q in enumerate(generated + bank + filler)]
+
+
+def _mock_exam(request, questions: list):
+    return {
+        "intent": "mock_exam",
+        "grade": request.grade,
+        "subject": request.subject,
+        "chapter": request.chapter_name,
+        "duration_minutes": request.duration_minutes,
+        "questions": questions
+    }
+
+
 @app.post("/generate-mock/")
-def generate_mock(request: MockRequest):
+async def generate_mock(request: MockRequest):
+
+    from app.services.mock_engine import generate_mock_exam_llm_async
+
+    # Served from the chapter's question bank when it has enough questions
+    questions = await asyncio.to_thread(
+        sample_questions,
+        request.grade,
+        request.subject,
+        request.chapter_name,
+        request.number_of_questions,
+        request.student_id
+    )
+
+    if questions is not None:
+        return _mock_exam(request, questions)
 
-    results = search_similar(
+    shards = shard_count(request.number_of_questions)
+
+    results = await search_similar_cached_async(
         grade=request.grade,
         subject=request.subject,
         chapter_name=request.chapter_name,
-        query_vector=generate_embedding(request.chapter_name),
-        limit=10
+        query_vector=await generate_embedding_async(request.chapter_name),
+        limit=min(10 * shards, GENERATION_CONTEXT_LIMIT)
     )
 
+    # Shards split this between them; capped so a large set does not
+    # multiply retrieval and prompt size
     context_text = "\n\n".join(
-        [r["content"] for r in results]
-    )[:4000]
+        [r.content for r in results]
+    )[:min(4000 * shards, GENERATION_CONTEXT_CHARS)]
 
     try:
-        return generate_mock_exam_llm(
+        mock = await generate_mock_exam_llm_async(
             context=context_text,
             chapter_name=request.chapter_name,
             num_questions=request.number_of_questions,
@@ -107,14 +338,16 @@ def generate_mock(request: MockRequest):
             grade=request.grade,
             subject=request.subject
         )
-    except Exception:
-        return generate_fallback_mock(
-            chapter_name=request.chapter_name,
-            num_questions=request.number_of_questions,
-            duration_minutes=request.duration_minutes,
-            grade=request.grade,
-            subject=request.subject
-        )
+    except IncompleteGeneration as e:
+        return _mock_exam(request, await _fill_questions(request, e.questions))
+    except Exception as e:
+        print("Mock generation failed:", str(e))
+        return _mock_exam(request, await _fill_questions(request, []))
+
+    # Bank is still cold for this chapter: keep these for the next students
+    await _keep_partial(request, mock.get("questions", []))
+
+    return mock
 
 
 # --------------------------------------------------
@@ -141,31 +374,77 @@ def submit_mock(submission: SubmissionRequest):
 # --------------------------------------------------
 # GENERATE QUESTION PAPER (SEPARATE ENGINE)
 # --------------------------------------------------
+def _paper_preview(request, questions: list):
+    return {
+        "type": "question_paper_preview",
+        "paper_data": {
+            "school_name": "AiSmartLive Olympiad School",
+            "grade": request.grade,
+            "subject": request.subject,
+            "chapter": request.chapter_name,
+            "difficulty_level": request.difficulty_level,
+            "duration_minutes": request.duration_minutes,
+            "marks_per_question": request.marks_per_question,
+            "questions": questions
+        }
+    }
+
+
 @app.post("/generate-question-paper/")
-def generate_question_paper(request: QuestionPaperRequest):
+async def generate_question_paper(request: QuestionPaperRequest):
+
+    from app.services.question_paper_engine import generate_question_paper_llm_async
+
+    questions = await asyncio.to_thread(
+        sample_questions,
+        request.grade,
+        request.subject,
+        request.chapter_name,
+        request.number_of_questions,
+        request.student_id,
+        request.difficulty_level
+    )
+
+    if questions is not None:
+        return _paper_preview(request, questions)
+
+    shards = shard_count(request.number_of_questions)
 
-    results = search_similar(
+    results = await search_similar_cached_async(
         grade=request.grade,
         subject=request.subject,
         chapter_name=request.chapter_name,
-        query_vector=generate_embedding(request.chapter_name),
-        limit=10
+        query_vector=await generate_embedding_async(request.chapter_name),
+        limit=min(10 * shards, GENERATION_CONTEXT_LIMIT)
     )
 
+    # Shards split this between them; capped so a large set does not
+    # multiply retrieval and prompt size
     context_text = "\n\n".join(
-        [r["content"] for r in results]
-    )[:4000]
+        [r.content for r in results]
+    )[:min(4000 * shards, GENERATION_CONTEXT_CHARS)]
 
-    paper_data = generate_question_paper_llm(
-        context=context_text,
-        chapter_name=request.chapter_name,
-        num_questions=request.number_of_questions,
-        duration_minutes=request.duration_minutes,
-        grade=request.grade,
-        subject=request.subject,
-        marks_per_question=request.marks_per_question,
-        difficulty_level=request.difficulty_level
-    )
+    difficulty = request.difficulty_level.lower()
+    difficulty = difficulty if difficulty in ("easy", "medium", "hard") else "medium"
+
+    try:
+        paper_data = await generate_question_paper_llm_async(
+            context=context_text,
+            chapter_name=request.chapter_name,
+            num_questions=request.number_of_questions,
+            duration_minutes=request.duration_minutes,
+            grade=request.grade,
+            subject=request.subject,
+            marks_per_question=request.marks_per_question,
+            difficulty_level=request.difficulty_level
+        )
+    except IncompleteGeneration as e:
+        return _paper_preview(request, await _fill_questions(request, e.questions, difficulty))
+    except Exception as e:
+        print("Question paper generation failed:", str(e))
+        return _paper_preview(request, await _fill_questions(request, [], difficulty))
+
+    await _keep_partial(request, paper_data.get("questions", []), difficulty)
 
     return {
         "type": "question_paper_preview",
@@ -179,6 +458,8 @@ def generate_question_paper(request: QuestionPaperRequest):
 @app.post("/modify-question-paper/")
 def modify_question_paper(request: dict):
 
+    from app.services.question_paper_modify_engine import regenerate_question_paper_with_modifications
+
     original_paper = request["original_paper"]
     modification_request = request["modification_request"]
 
@@ -196,6 +477,8 @@ def modify_question_paper(request: dict):
 @app.post("/generate-question-paper-pdf/")
 def generate_question_paper_pdf_endpoint(request: dict):
 
+    from app.services.pdf_exam_generator import generate_question_paper_pdf
+
     paper_data = request["paper_data"]
 
     filename = f"question_paper_{uuid.uuid4().hex}.pdf"
@@ -238,13 +521,7 @@ def download_file(filename: str):
 
 @app.get("/grades")
 def get_grades():
-    collections = client.get_collections().collections
-    grades = [
-        col.name.replace("olympiad_grade_", "")
-        for col in collections
-        if col.name.startswith("olympiad_grade_")
-    ]
-    return sorted(grades)
+    return list_grades()
 
 
 # --------------------------------------------------
@@ -253,50 +530,122 @@ def get_grades():
 
 @app.get("/subjects")
 def get_subjects(grade: int):
+    return list_subjects(grade)
 
-    collection_name = f"olympiad_grade_{grade}"
 
-    results = client.scroll(
-        collection_name=collection_name,
-        limit=500
-    )
+# --------------------------------------------------
+# GET CHAPTERS
+# --------------------------------------------------
+
+@app.get("/chapters")
+def get_chapters(grade: int, subject: str):
+    return list_chapters(grade, subject)
+
+
+# --------------------------------------------------
+# CACHE METRICS
+# --------------------------------------------------
 
-    subjects = {
-        point.payload["subject"]
-        for point in results[0]
+@app.get("/metrics/cache")
+def cache_metrics():
+    return {
+        "embedding": embedding_cache_stats(),
+        "embedding_batcher": embedding_batcher_stats(),
+        "retrieval": retrieval_cache_stats(),
+        "answers": answer_cache_stats()
     }
 
-    return sorted(list(subjects))
+
+# --------------------------------------------------
+# QUESTION BANK
+# --------------------------------------------------
+
+@app.get("/question-bank")
+def question_bank_status(grade: int, subject: str, chapter_name: str):
+    return bank_counts(grade, subject, chapter_name)
 
 
 # --------------------------------------------------
-# GET CHAPTERS
+# LLM METRICS
 # --------------------------------------------------
 
-@app.get("/chapters")
-def get_chapters(grade: int, subject: str):
+@app.get("/metrics/llm")
+def llm_metrics():
+    return llm_stats()
 
-    collection_name = f"olympiad_grade_{grade}"
-
-    results = client.scroll(
-        collection_name=collection_name,
-        scroll_filter=Filter(
-            must=[
-                FieldCondition(
-                    key="subject",
-                    match=MatchValue(value=subject.lower())
-                )
-            ]
-        ),
-        limit=1000
-    )
 
-    chapters = {
-        point.payload["chapter_name"]
-        for point in results[0]
+# --------------------------------------------------
+# BACKGROUND INGESTION JOBS
+# --------------------------------------------------
+
+@app.post("/ingest")
+def ingest_upload(
+    file: UploadFile = File(...),
+    grade: int = Form(...),
+    subject: str = Form(...),
+    chapter_name: str = Form(...)
+):
+
+    os.makedirs(INGEST_UPLOAD_DIR, exist_ok=True)
+
+    file_path = os.path.join(INGEST_UPLOAD_DIR, f"{uuid.uuid4().hex}.pdf")
+
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(file.file, f)
+
+    params = {
+        "filename": file.filename,
+        "grade": grade,
+        "subject": subject,
+        "chapter_name": chapter_name
     }
 
-    return sorted(list(chapters))
+    try:
+        job = submit_job(
+            "pdf",
+            params,
+            file_path=file_path,
+            grade=grade,
+            subject=subject,
+            chapter_name=chapter_name
+        )
+    except IngestQueueFull as e:
+        os.remove(file_path)
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+
+@app.post("/ingest/bulk")
+def ingest_bulk(request: BulkIngestRequest):
+
+    try:
+        job = submit_job(
+            "bulk",
+            request.model_dump(),
+            parallel=request.parallel,
+            force=request.force
+        )
+    except IngestQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+
+@app.get("/ingest/jobs")
+def ingest_jobs():
+    return list_jobs()
+
+
+@app.get("/ingest/jobs/{job_id}")
+def ingest_job_status(job_id: str):
+
+    job = get_job(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    return job
 
 
 # --------------------------------------------------
@@ -335,9 +684,15 @@ from app.models.planner_models import PlannerRequest
 @app.post("/generate-plan/")
 def generate_plan(request: PlannerRequest):
 
+   from app.services.planner_engine import generate_llm_plan
+
    return generate_llm_plan(
     duration_days=request.duration_days,
     chapter_name=request.chapter_name,
     grade=request.grade,
     subject=request.subject
-)
\ No newline at end of file
+)
+
+
+IMPORT_SECONDS = round(time.perf_counter() - _import_started, 3)
+print(f"App imported in {IMPORT_SECONDS}s")
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class BulkIngestRequest(BaseModel):
+    parallel: bool = False
+    force: bool = False
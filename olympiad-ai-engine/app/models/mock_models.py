@@ -1,18 +1,19 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 from typing import Optional
-
-from pydantic import BaseModel
+from app.config import GENERATION_MAX_QUESTIONS
 
 
 class QuestionPaperRequest(BaseModel):
     grade: int
     subject: str
     chapter_name: str
-    number_of_questions: int
+    number_of_questions: int = Field(gt=0, le=GENERATION_MAX_QUESTIONS)
     duration_minutes: int
     marks_per_question: int
     difficulty_level: str
+    # Set to avoid repeating bank questions this student has already seen
+    student_id: Optional[str] = None
 # -----------------------------
 # REQUEST FOR MOCK GENERATION
 # -----------------------------
@@ -20,8 +21,9 @@ class MockRequest(BaseModel):
     grade: int
     subject: str
     chapter_name: str
-    number_of_questions: int
+    number_of_questions: int = Field(gt=0, le=GENERATION_MAX_QUESTIONS)
     duration_minutes: int
+    student_id: Optional[str] = None
 
 
 # -----------------------------
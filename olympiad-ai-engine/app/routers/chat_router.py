@@ -26,7 +26,7 @@ def chat(request: AskRequest):
     if not results:
         return {"answer": "Answer not found in lesson."}
 
-    context = "\n\n".join([r["content"] for r in results])
+    context = "\n\n".join([r.content for r in results])
 
     answer = generate_answer(context, request.question)
 
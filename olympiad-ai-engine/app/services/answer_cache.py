@@ -0,0 +1,246 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from app.config import (
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL_SECONDS,
+    SEMANTIC_CACHE_BUCKET_SIZE,
+    SEMANTIC_CACHE_MAX_BUCKETS
+)
+from app.vectorstore.catalog import grade_generation_async
+
+# Semantic cache of /ask answers. Each (grade, subject, chapter) bucket is a
+# small matrix of normalized question vectors; a new question whose cosine
+# similarity to a cached one reaches SEMANTIC_CACHE_THRESHOLD gets the cached
+# answer without retrieval or an LLM call.
+#
+# Embeddings barely move when only a number changes ("12 x 15" vs "12 x 16"
+# score above 0.95), so a hit also requires the questions' numbers and
+# single-letter variables to match exactly.
+#
+# Buckets remember the grade's catalog generation and are emptied when
+# ingestion bumps it. The catalog is a file on each box, so a re-ingest on
+# one node does not reach another node's cache; there, entries only expire
+# after SEMANTIC_CACHE_TTL_SECONDS. Treat this cache as single-node, or keep
+# the TTL as short as stale answers may live after a re-ingest.
+
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_SIGNATURE = re.compile(r"\d+(?:[.,]\d+)*|(?<![^\W\d_])[A-Za-z](?![^\W\d_])")
+
+
+def _canonical_number(token: str):
+    # 1,000 == 1000 and 7.50 == 7.5
+    token = token.replace(",", "")
+    if "." in token:
+        token = token.rstrip("0").rstrip(".")
+    return token.lstrip("0") or "0"
+
+
+def question_signature(question: str):
+    # Numbers and single-letter variables, in order; must match for a hit
+    return tuple(
+        _canonical_number(token) if _NUMBER.fullmatch(token) else token
+        for token in _SIGNATURE.findall(question or "")
+    )
+
+
+class _Bucket:
+
+    def __init__(self, generation: int, capacity: int, dim: int):
+        self.generation = generation
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.signatures = []
+        self.answers = []
+        self.sources = []
+        self.expires_at = []
+        self.last_used = []
+
+    def __len__(self):
+        return len(self.answers)
+
+    def remove(self, index: int):
+        # Swap the last row into the hole to keep the matrix dense
+        last = len(self.answers) - 1
+        if index != last:
+            self.vectors[index] = self.vectors[last]
+            self.signatures[index] = self.signatures[last]
+            self.answers[index] = self.answers[last]
+            self.sources[index] = self.sources[last]
+            self.expires_at[index] = self.expires_at[last]
+            self.last_used[index] = self.last_used[last]
+        self.signatures.pop()
+        self.answers.pop()
+        self.sources.pop()
+        self.expires_at.pop()
+        self.last_used.pop()
+
+    def best_match(self, query, signature: tuple):
+        candidates = [i for i, s in enumerate(self.signatures) if s == signature]
+        if not candidates:
+            return None, 0.0
+        scores = self.vectors[candidates] @ query
+        best = int(np.argmax(scores))
+        return candidates[best], float(scores[best])
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+def _bucket_key(grade, subject, chapter_name):
+    return (int(grade), subject.lower(), (chapter_name or "").lower())
+
+
+class SemanticAnswerCache:
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: float = SEMANTIC_CACHE_TTL_SECONDS,
+        bucket_size: int = SEMANTIC_CACHE_BUCKET_SIZE,
+        max_buckets: int = SEMANTIC_CACHE_MAX_BUCKETS
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.bucket_size = bucket_size
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _bucket(self, key, generation: int, dim: int, create: bool):
+        bucket = self._buckets.get(key)
+
+        if bucket is not None and bucket.generation > generation:
+            # Caller read the catalog before a newer ingest: its answer is stale
+            return None
+
+        if bucket is not None and bucket.generation != generation:
+            # Chapter content changed since these answers were generated
+            del self._buckets[key]
+            self.invalidations += 1
+            bucket = None
+
+        if bucket is None and create:
+            bucket = self._buckets[key] = _Bucket(generation, self.bucket_size, dim)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+
+        if bucket is not None:
+            self._buckets.move_to_end(key)
+
+        return bucket
+
+    def lookup(self, grade, subject, chapter_name, question: str, query_vector, generation: int):
+        query = _normalize(query_vector)
+        signature = question_signature(question)
+
+        with self._lock:
+            bucket = self._bucket(_bucket_key(grade, subject, chapter_name), generation, len(query), False)
+
+            if bucket is not None:
+                index, score = bucket.best_match(query, signature)
+
+                if index is not None and score >= self.threshold:
+                    if bucket.expires_at[index] is not None and bucket.expires_at[index] <= time.monotonic():
+                        bucket.remove(index)
+                    else:
+                        bucket.last_used[index] = time.monotonic()
+                        self.hits += 1
+                        return {
+                            "answer": bucket.answers[index],
+                            "sources": bucket.sources[index],
+                            "similarity": round(score, 4)
+                        }
+
+            self.misses += 1
+            return None
+
+    def store(self, grade, subject, chapter_name, question: str, query_vector, generation: int, answer: str, sources: list = None):
+        if self.bucket_size <= 0:
+            return
+
+        query = _normalize(query_vector)
+        signature = question_signature(question)
+        now = time.monotonic()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds > 0 else None
+
+        with self._lock:
+            bucket = self._bucket(_bucket_key(grade, subject, chapter_name), generation, len(query), True)
+            if bucket is None:
+                return
+
+            index, score = bucket.best_match(query, signature)
+            if index is None or score < self.threshold:
+                if len(bucket) >= self.bucket_size:
+                    # Least recently used answer makes room
+                    bucket.remove(int(np.argmin(bucket.last_used)))
+                    self.evictions += 1
+                index = len(bucket)
+                bucket.signatures.append(None)
+                bucket.answers.append(None)
+                bucket.sources.append(None)
+                bucket.expires_at.append(None)
+                bucket.last_used.append(None)
+
+            bucket.vectors[index] = query
+            bucket.signatures[index] = signature
+            bucket.answers[index] = answer
+            bucket.sources[index] = sources or []
+            bucket.expires_at[index] = expires_at
+            bucket.last_used[index] = now
+            self.stores += 1
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": SEMANTIC_CACHE_ENABLED,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl_seconds,
+                "buckets": len(self._buckets),
+                "entries": sum(len(bucket) for bucket in self._buckets.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_cache = SemanticAnswerCache()
+
+
+async def lookup_answer_async(grade, subject, chapter_name, question: str, query_vector):
+
+    # Returns (cached entry or None, generation). The generation is read
+    # before retrieval and must be the one the answer is stored under, so
+    # an ingest that lands while the LLM runs invalidates that answer.
+    generation = await grade_generation_async(grade)
+    if not SEMANTIC_CACHE_ENABLED:
+        return None, generation
+    return _cache.lookup(grade, subject, chapter_name, question, query_vector, generation), generation
+
+
+def store_answer(grade, subject, chapter_name, question: str, query_vector, generation: int, answer: str, sources: list = None):
+    if SEMANTIC_CACHE_ENABLED:
+        _cache.store(grade, subject, chapter_name, question, query_vector, generation, answer, sources)
+
+
+def answer_cache_stats():
+    return _cache.stats()
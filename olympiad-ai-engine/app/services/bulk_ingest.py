@@ -1,9 +1,64 @@
 import os
-from app.services.ingest import ingest_pdf
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from app.config import INGEST_WORKERS, INGEST_MANIFEST_PATH
+from app.services.hashing import file_sha256
+from app.services.ingest import ingest_pdf, extract_chunks, ingest_chunks
 
-def ingest_all_pdfs(base_path="data/pdfs"):
 
-    for grade_folder in os.listdir(base_path):
+# --------------------------------------------------
+# MANIFEST (sha256 + destination -> ingested file record)
+# --------------------------------------------------
+
+def manifest_key(sha, grade, subject, chapter_name):
+    # The same PDF filed under two chapters is two separate ingests
+    return f"{sha}:{grade}:{subject.lower()}:{chapter_name.lower()}"
+
+
+def load_manifest(manifest_path: str = INGEST_MANIFEST_PATH):
+
+    if not os.path.exists(manifest_path):
+        return {}
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict, manifest_path: str = INGEST_MANIFEST_PATH):
+
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Write-then-rename so an interrupted run never leaves a torn manifest
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _record(manifest, sha, file_path, grade, subject, chapter_name, result):
+
+    manifest[manifest_key(sha, grade, subject, chapter_name)] = {
+        "sha256": sha,
+        "path": file_path,
+        "grade": grade,
+        "subject": subject,
+        "chapter_name": chapter_name,
+        "chunks": result["chunks"],
+        "chunk_stats": result.get("chunk_stats"),
+        "ingested_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+# --------------------------------------------------
+# DISCOVER data/pdfs/gradeN/subject/*.pdf
+# --------------------------------------------------
+
+def discover_pdfs(base_path="data/pdfs"):
+
+    for grade_folder in sorted(os.listdir(base_path)):
 
         grade_path = os.path.join(base_path, grade_folder)
 
@@ -12,7 +67,7 @@ def ingest_all_pdfs(base_path="data/pdfs"):
 
         grade = int(grade_folder.replace("grade", ""))
 
-        for subject_folder in os.listdir(grade_path):
+        for subject_folder in sorted(os.listdir(grade_path)):
 
             subject_path = os.path.join(grade_path, subject_folder)
 
@@ -21,7 +76,7 @@ def ingest_all_pdfs(base_path="data/pdfs"):
 
             subject = subject_folder.lower()
 
-            for file in os.listdir(subject_path):
+            for file in sorted(os.listdir(subject_path)):
 
                 if file.endswith(".pdf"):
 
@@ -34,13 +89,153 @@ def ingest_all_pdfs(base_path="data/pdfs"):
                             .lower()
                     )
 
-                    print(f"Ingesting Grade {grade} | {subject} | {chapter_name}")
+                    yield file_path, grade, subject, chapter_name
 
-                    ingest_pdf(
-                        file_path=file_path,
-                        grade=grade,
-                        subject=subject,
-                        chapter_name=chapter_name
-                    )
 
-    return {"status": "All PDFs successfully ingested"}
\ No newline at end of file
+# --------------------------------------------------
+# BULK INGEST
+# --------------------------------------------------
+
+def ingest_all_pdfs(
+    base_path="data/pdfs",
+    parallel: bool = False,
+    workers: int = INGEST_WORKERS,
+    manifest_path: str = INGEST_MANIFEST_PATH,
+    force: bool = False,
+    progress=None
+):
+
+    manifest = {} if force else load_manifest(manifest_path)
+
+    pending = []
+    skipped = 0
+
+    for file_path, grade, subject, chapter_name in discover_pdfs(base_path):
+
+        sha = file_sha256(file_path)
+
+        if manifest_key(sha, grade, subject, chapter_name) in manifest:
+            skipped += 1
+            continue
+
+        pending.append((sha, file_path, grade, subject, chapter_name))
+
+    print(f"{len(pending)} PDFs to ingest, {skipped} unchanged")
+
+    if progress is not None:
+        progress("files_total", len(pending))
+
+    # Both modes carry on past a failed file and report it; failed files
+    # stay out of the manifest so the next run retries them.
+    failed = []
+
+    if parallel and pending:
+        ingested = _ingest_parallel(pending, workers, manifest, manifest_path, failed, progress)
+    else:
+        ingested = _ingest_sequential(pending, manifest, manifest_path, failed, progress)
+
+    return {
+        "status": "All PDFs successfully ingested" if not failed else f"{len(failed)} PDFs failed to ingest",
+        "ingested": ingested,
+        "skipped": skipped,
+        "failed": failed
+    }
+
+
+def _failure(failed, file_path, grade, subject, chapter_name, stage, error, progress=None):
+
+    print(f"❌ {stage.capitalize()} failed for {file_path}:", error)
+
+    failed.append({
+        "path": file_path,
+        "grade": grade,
+        "subject": subject,
+        "chapter_name": chapter_name,
+        "stage": stage,
+        "error": str(error)
+    })
+
+    if progress is not None:
+        progress("files_failed", 1)
+
+
+def _ingest_sequential(pending, manifest, manifest_path, failed, progress=None):
+
+    ingested = 0
+
+    for sha, file_path, grade, subject, chapter_name in pending:
+
+        print(f"Ingesting Grade {grade} | {subject} | {chapter_name}")
+
+        try:
+            result = ingest_pdf(
+                file_path=file_path,
+                grade=grade,
+                subject=subject,
+                chapter_name=chapter_name,
+                progress=progress
+            )
+        except Exception as e:
+            _failure(failed, file_path, grade, subject, chapter_name, "ingest", e, progress)
+            continue
+
+        _record(manifest, sha, file_path, grade, subject, chapter_name, result)
+        save_manifest(manifest, manifest_path)
+        ingested += 1
+
+        if progress is not None:
+            progress("files_done", 1)
+
+    return ingested
+
+
+def _ingest_parallel(pending, workers, manifest, manifest_path, failed, progress=None):
+
+    ingested = 0
+
+    # Extraction + chunking fan out to worker processes; this process is
+    # the single consumer feeding the embedder and Qdrant.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        futures = {
+            pool.submit(extract_chunks, job[1]): job
+            for job in pending
+        }
+
+        for future in as_completed(futures):
+
+            sha, file_path, grade, subject, chapter_name = futures[future]
+
+            try:
+                concepts, chunk_stats, pages = future.result()
+            except Exception as e:
+                _failure(failed, file_path, grade, subject, chapter_name, "extraction", e, progress)
+                continue
+
+            if progress is not None:
+                progress("pages_extracted", pages)
+
+            print(f"Ingesting Grade {grade} | {subject} | {chapter_name}")
+
+            try:
+                result = ingest_chunks(
+                    concepts,
+                    grade=grade,
+                    subject=subject,
+                    chapter_name=chapter_name,
+                    progress=progress
+                )
+            except Exception as e:
+                _failure(failed, file_path, grade, subject, chapter_name, "ingest", e, progress)
+                continue
+
+            result["chunk_stats"] = chunk_stats
+
+            _record(manifest, sha, file_path, grade, subject, chapter_name, result)
+            save_manifest(manifest, manifest_path)
+            ingested += 1
+
+            if progress is not None:
+                progress("files_done", 1)
+
+    return ingested
@@ -1,6 +1,202 @@
 import re
+import math
+from app.config import (
+    EMBEDDING_MODEL,
+    CHUNK_MAX_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
+    CHUNK_MIN_CHARS
+)
+
+CONCEPT_MARKER = re.compile(r'Concept \d+:')
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n\s*\n')
+SECTION_BREAK = object()
+
+# A sentence fragment carried across pages is flushed once it gets this long
+MAX_CARRY_CHARS = 4000
+
+_tokenizer = None
+
+
+# --------------------------------------------------
+# TOKEN COUNTING
+# --------------------------------------------------
+
+def _get_tokenizer():
+    global _tokenizer
+    if _tokenizer is None:
+        try:
+            from transformers import AutoTokenizer
+            _tokenizer = AutoTokenizer.from_pretrained(f"sentence-transformers/{EMBEDDING_MODEL}")
+        except Exception as e:
+            print("⚠️ Tokenizer unavailable, estimating token counts:", e)
+            _tokenizer = False
+    return _tokenizer
+
+
+def count_tokens(text: str):
+    tokenizer = _get_tokenizer()
+    if tokenizer:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    # Word-piece splits run ~1.3 tokens per word/punctuation mark
+    return math.ceil(len(re.findall(r"\w+|[^\w\s]", text)) * 1.3)
+
+
+# --------------------------------------------------
+# CHUNK STATISTICS
+# --------------------------------------------------
+
+class ChunkStats:
+
+    def __init__(self):
+        self.token_counts = []
+
+    def add(self, tokens: int):
+        self.token_counts.append(tokens)
+
+    def summary(self):
+        counts = sorted(self.token_counts)
+
+        if not counts:
+            return {"chunks": 0}
+
+        def percentile(p):
+            return counts[min(len(counts) - 1, int(p * len(counts)))]
+
+        return {
+            "chunks": len(counts),
+            "min_tokens": counts[0],
+            "max_tokens": counts[-1],
+            "mean_tokens": round(sum(counts) / len(counts), 1),
+            "p50_tokens": percentile(0.50),
+            "p95_tokens": percentile(0.95)
+        }
+
+
+# --------------------------------------------------
+# STREAMING CHUNKER
+# --------------------------------------------------
+
+def _units(pages):
+    # Sentences in document order, with SECTION_BREAK at every
+    # "Concept N:" marker. The trailing fragment of each page is carried
+    # into the next one so sentences spanning a page break stay whole.
+    carry = ""
+
+    for page in pages:
+        pieces = CONCEPT_MARKER.split(carry + page + "\n")
+
+        for i, piece in enumerate(pieces):
+
+            if i > 0:
+                yield SECTION_BREAK
+
+            sentences = SENTENCE_BOUNDARY.split(piece)
+
+            if i == len(pieces) - 1:
+                carry = sentences.pop()
+                if len(carry) > MAX_CARRY_CHARS:
+                    sentences.append(carry)
+                    carry = ""
+
+            for sentence in sentences:
+                if sentence.strip():
+                    yield sentence.strip()
+
+    if carry.strip():
+        yield carry.strip()
+
+
+def _fit(sentence: str, max_tokens: int):
+    # Hard-split sentences that alone exceed the token budget
+    tokens = count_tokens(sentence)
+
+    if tokens <= max_tokens:
+        yield sentence, tokens
+        return
+
+    words = sentence.split()
+    step = max(1, len(words) * max_tokens // tokens)
+    start = 0
+
+    while start < len(words):
+        stop = min(len(words), start + step)
+        piece = " ".join(words[start:stop])
+        piece_tokens = count_tokens(piece)
+
+        while piece_tokens > max_tokens and stop - start > 1:
+            stop -= max(1, (stop - start) // 10)
+            piece = " ".join(words[start:stop])
+            piece_tokens = count_tokens(piece)
+
+        yield piece, piece_tokens
+        start = stop
+
+
+def iter_chunks(
+    pages,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+    min_chars: int = CHUNK_MIN_CHARS,
+    stats: ChunkStats = None
+):
+
+    window = []
+    window_tokens = 0
+    # False while the window holds only overlap already emitted last time
+    fresh = False
+
+    def emit():
+        if not fresh:
+            return None
+        text = " ".join(sentence for sentence, _ in window)
+        if len(text) < min_chars:
+            return None
+        if stats is not None:
+            stats.add(window_tokens)
+        return text
+
+    for unit in _units(pages):
+
+        # Concept markers always start a fresh chunk, no overlap across them
+        if unit is SECTION_BREAK:
+            chunk = emit()
+            if chunk:
+                yield chunk
+            window = []
+            window_tokens = 0
+            fresh = False
+            continue
+
+        for sentence, tokens in _fit(unit, max_tokens):
+
+            if window and window_tokens + tokens > max_tokens:
+                chunk = emit()
+                if chunk:
+                    yield chunk
+
+                # Carry trailing sentences forward as overlap
+                keep = []
+                kept = 0
+                for item in reversed(window):
+                    if kept + item[1] > overlap_tokens:
+                        break
+                    keep.insert(0, item)
+                    kept += item[1]
+
+                while keep and kept + tokens > max_tokens:
+                    kept -= keep.pop(0)[1]
+
+                window = keep
+                window_tokens = kept
+
+            window.append((sentence, tokens))
+            window_tokens += tokens
+            fresh = True
+
+    chunk = emit()
+    if chunk:
+        yield chunk
+
 
 def split_into_concepts(text: str):
-    concepts = re.split(r'Concept \d+:', text)
-    cleaned = [c.strip() for c in concepts if len(c.strip()) > 200]
-    return cleaned
+    return list(iter_chunks([text]))
@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+from contextlib import closing
+from app.config import EXTRACTION_CACHE_ENABLED, EXTRACTION_CACHE_PATH
+from app.services.hashing import file_sha256
+
+
+# --------------------------------------------------
+# SQLITE STORE: (sha256, extractor version) -> pages
+# --------------------------------------------------
+
+def _connect(cache_path: str = EXTRACTION_CACHE_PATH):
+
+    directory = os.path.dirname(cache_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(cache_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS extracted_pages (
+            sha256 TEXT NOT NULL,
+            extractor_version TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            pages BLOB NOT NULL,
+            PRIMARY KEY (sha256, extractor_version)
+        )
+        """
+    )
+    return conn
+
+
+def get_pages(sha: str, extractor_version: str, cache_path: str = EXTRACTION_CACHE_PATH):
+
+    with closing(_connect(cache_path)) as conn:
+        row = conn.execute(
+            "SELECT pages FROM extracted_pages WHERE sha256 = ? AND extractor_version = ?",
+            (sha, extractor_version)
+        ).fetchone()
+
+    if row is None:
+        return None
+
+    return json.loads(zlib.decompress(row[0]))
+
+
+def put_pages(sha: str, extractor_version: str, pages: list, cache_path: str = EXTRACTION_CACHE_PATH):
+
+    blob = zlib.compress(json.dumps(pages).encode("utf-8"), 6)
+
+    with closing(_connect(cache_path)) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO extracted_pages VALUES (?, ?, ?, ?)",
+            (sha, extractor_version, time.time(), blob)
+        )
+
+
+# --------------------------------------------------
+# CACHED PAGE STREAM
+# --------------------------------------------------
+
+def cached_pages(
+    file_path: str,
+    extractor_version: str,
+    extract,
+    enabled: bool = EXTRACTION_CACHE_ENABLED,
+    cacheable=None
+):
+
+    if not enabled:
+        yield from extract()
+        return
+
+    sha = file_sha256(file_path)
+
+    pages = get_pages(sha, extractor_version)
+
+    if pages is not None:
+        print(f"⚡ Extraction cache hit: {file_path}")
+        yield from pages
+        return
+
+    # Stream through while collecting; only a fully extracted document is stored
+    pages = []
+    for text in extract():
+        pages.append(text)
+        yield text
+
+    if cacheable is not None and not cacheable():
+        print(f"⚠️ Degraded extraction not cached: {file_path}")
+        return
+
+    put_pages(sha, extractor_version, pages)
@@ -1,71 +1,337 @@
 import os
+import re
 import pdfplumber
+import tempfile
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
 from dotenv import load_dotenv
 import google.generativeai as genai
+from pypdf import PdfReader, PdfWriter
+from app.config import (
+    PDF_PAGE_WORKERS,
+    OCR_MIN_PAGE_CHARS,
+    OCR_MAX_PAGES_PER_REQUEST,
+    OCR_CONCURRENCY,
+    OCR_FILE_API
+)
+from app.services.pdf_loader import _page_ranges
+from app.services.extraction_cache import cached_pages
 
 load_dotenv()
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
+# Bump whenever extraction output changes so cached pages are not reused
+EXTRACTOR_VERSION = "pdfplumber+ocr-3"
 
-def load_pdf(file_path: str):
+OCR_PROMPT = """
+        Extract ALL readable text from this PDF.
+        Do not summarize.
+        Do not skip anything.
+        Maintain structure.
+        Return plaintext only.
+        Start every page with a line "=== PAGE n ===" (n counts from 1),
+        even when the page is empty.
+        """
 
-    print(f"\n📄 Processing: {file_path}")
+_PAGE_MARKER = re.compile(r"^=== PAGE \d+ ===[ \t]*$", re.MULTILINE)
 
-    # -----------------------------
-    # 1️⃣ Try pdfplumber (Primary)
-    # -----------------------------
-    try:
-        full_text = ""
 
+# -----------------------------
+# File APIs for the OCR fallback
+# -----------------------------
+class GeminiFileAPI:
+
+    extractor_id = "gemini-2.5-flash"
+
+    def upload_file(self, path: str, display_name: str):
+        return genai.upload_file(path=path, display_name=display_name)
+
+    def get_file(self, name: str):
+        return genai.get_file(name)
+
+    def generate_content(self, contents):
+        model = genai.GenerativeModel("gemini-2.5-flash")
+        return model.generate_content(contents)
+
+
+class LocalFileAPI:
+
+    # Offline stand-in with the same surface as GeminiFileAPI. "OCR" is
+    # pypdf text extraction unless a responder(path) -> str is supplied.
+    extractor_id = "local-pypdf"
+
+    def __init__(self, responder=None, latency_seconds: float = 0.0):
+        self.responder = responder
+        self.latency_seconds = latency_seconds
+        self.uploads = []
+
+    def upload_file(self, path: str, display_name: str):
+        self.uploads.append(path)
+        return SimpleNamespace(name=path, display_name=display_name, state=SimpleNamespace(name="ACTIVE"))
+
+    def get_file(self, name: str):
+        return SimpleNamespace(name=name, state=SimpleNamespace(name="ACTIVE"))
+
+    def generate_content(self, contents):
+        uploaded_file = contents[-1]
+        time.sleep(self.latency_seconds)
+
+        if self.responder:
+            text = self.responder(uploaded_file.name)
+        else:
+            reader = PdfReader(uploaded_file.name)
+            text = "\n".join(
+                f"=== PAGE {number} ===\n{page.extract_text() or ''}"
+                for number, page in enumerate(reader.pages, start=1)
+            )
+
+        return SimpleNamespace(text=text)
+
+
+def get_file_api(name: str = OCR_FILE_API):
+    if name == "local":
+        return LocalFileAPI()
+    return GeminiFileAPI()
+
+
+# -----------------------------
+# pdfplumber page extraction
+# -----------------------------
+def _read_page(page):
+
+    text = page.extract_text() or ""
+
+    # Only images can hold text pdfplumber did not find
+    return text, bool(page.images)
+
+
+def _extract_range(file_path: str, start: int, stop: int):
+
+    records = []
+
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            records.append(_read_page(page))
+            page.close()
+
+    return records
+
+
+def _iter_page_records(file_path: str, workers: int = 1):
+
+    if workers <= 1:
         with pdfplumber.open(file_path) as pdf:
             for page in pdf.pages:
-                text = page.extract_text() or ""
-                full_text += text + "\n"
+                yield _read_page(page)
+                # Drop cached layout objects so memory stays flat per page
+                page.close()
+        return
 
-        if full_text.strip() and len(full_text.strip()) > 250:
-            print("✅ Extracted using pdfplumber")
-            return full_text
-        else:
-            print("⚠️ pdfplumber extraction low/empty")
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
 
-    except Exception as e:
-        print("❌ pdfplumber failed:", e)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_extract_range, file_path, start, stop)
+            for start, stop in _page_ranges(page_count, workers)
+        ]
+        for future in futures:
+            yield from future.result()
+
+
+def extractor_version(file_api):
+
+    # Cached pages are only reused by the same OCR backend and settings
+    api_id = getattr(file_api, "extractor_id", type(file_api).__name__)
+    return f"{EXTRACTOR_VERSION}|{api_id}|min-chars={OCR_MIN_PAGE_CHARS}|range={OCR_MAX_PAGES_PER_REQUEST}"
+
+
+def iter_pages(file_path: str, workers: int = PDF_PAGE_WORKERS, file_api=None):
+
+    print(f"\n📄 Processing: {file_path}")
+
+    file_api = file_api or get_file_api()
+    outcome = {}
+
+    return cached_pages(
+        file_path,
+        extractor_version(file_api),
+        lambda: _extract_pages(file_path, workers, file_api, outcome),
+        # Pages from a run where some OCR failed would be served forever
+        cacheable=lambda: not outcome.get("ocr_failures")
+    )
+
+
+def _extract_pages(file_path: str, workers: int, file_api=None, outcome: dict = None):
+
+    file_api = file_api or get_file_api()
+    outcome = {} if outcome is None else outcome
+
+    # Output slots in page order: plain text for pages pdfplumber handled,
+    # (future, fallback pages) for low-text page ranges sent to OCR. Every
+    # slot resolves to one text per page, so progress and the extraction
+    # cache stay page-aligned. A range whose OCR fails falls back to what
+    # pdfplumber found on those pages.
+    slots = deque()
+    low_pages = []
+    low_texts = []
+    ocr_ranges = 0
+    ocr_failures = 0
+    has_text = False
+    started = False
+
+    with ThreadPoolExecutor(max_workers=OCR_CONCURRENCY) as ocr_pool:
+
+        def close_range():
+            nonlocal ocr_ranges
+            if low_pages:
+                slots.append((
+                    ocr_pool.submit(_ocr_pages, file_api, file_path, list(low_pages)),
+                    list(low_texts)
+                ))
+                low_pages.clear()
+                low_texts.clear()
+                ocr_ranges += 1
+
+        def resolve(slot):
+            nonlocal ocr_failures, has_text
+            if isinstance(slot, str):
+                texts = [slot]
+            else:
+                future, fallback = slot
+                try:
+                    texts = future.result()
+                except Exception as e:
+                    print("⚠️ OCR range failed, keeping pdfplumber text:", e)
+                    ocr_failures += 1
+                    texts = fallback
+            has_text = has_text or any(text.strip() for text in texts)
+            return texts
+
+        def ready():
+            while slots and (isinstance(slots[0], str) or slots[0][0].done()):
+                yield from resolve(slots.popleft())
+
+        # -----------------------------
+        # 1️⃣ pdfplumber, page by page
+        # -----------------------------
+        try:
+            for page_number, (text, has_images) in enumerate(_iter_page_records(file_path, workers)):
+
+                started = True
+
+                # Short pages without images (titles, section breaks) have
+                # nothing more for OCR to find
+                if has_images and len(text.strip()) <= OCR_MIN_PAGE_CHARS:
+                    low_pages.append(page_number)
+                    low_texts.append(text)
+                    if len(low_pages) >= OCR_MAX_PAGES_PER_REQUEST:
+                        close_range()
+                    continue
+
+                close_range()
+                slots.append(text)
+                yield from ready()
+
+        except Exception as e:
+            if started:
+                raise
+            print("❌ pdfplumber failed:", e)
+            # Nothing readable locally, send the whole document
+            slots.append((ocr_pool.submit(_ocr_pages, file_api, file_path, None), []))
+            ocr_ranges += 1
+
+        close_range()
+
+        # -----------------------------
+        # 2️⃣ Merge OCR ranges in order
+        # -----------------------------
+        while slots:
+            yield from resolve(slots.popleft())
+
+    outcome["ocr_ranges"] = ocr_ranges
+    outcome["ocr_failures"] = ocr_failures
+
+    if ocr_failures and not has_text:
+        raise Exception("❌ All extraction methods failed.")
+
+    if ocr_failures:
+        print(f"⚠️ Extracted using pdfplumber + Gemini AI ({ocr_failures}/{ocr_ranges} OCR ranges failed)")
+    elif ocr_ranges:
+        print(f"✅ Extracted using pdfplumber + Gemini AI ({ocr_ranges} OCR ranges)")
+    else:
+        print("✅ Extracted using pdfplumber")
+
+
+def _write_sub_pdf(file_path: str, page_numbers: list):
+
+    reader = PdfReader(file_path)
+    writer = PdfWriter()
+
+    for page_number in page_numbers:
+        writer.add_page(reader.pages[page_number])
+
+    handle, sub_path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(handle, "wb") as f:
+        writer.write(f)
+
+    return sub_path
+
+
+def _split_pages(text: str, expected: int = None):
+
+    # One text per page from the model's "=== PAGE n ===" markers
+    pages = [page.strip("\n") for page in _PAGE_MARKER.split(text)[1:]]
+
+    if expected is None:
+        return pages or [text]
+
+    if len(pages) == expected:
+        return pages
+
+    # Markers missing or miscounted: keep the text on the range's first page
+    return [text] + [""] * (expected - 1)
+
+
+def _ocr_pages(file_api, file_path: str, page_numbers: list = None):
+
+    sub_path = None
 
-    # -----------------------------
-    # 2️⃣ Fallback to Gemini AI
-    # -----------------------------
     try:
-        print("🚀 Falling back to Gemini AI extraction...")
+        print("🚀 Falling back to Gemini AI extraction...", page_numbers or "all pages")
 
-        uploaded_file = genai.upload_file(
-            path=file_path,
+        if page_numbers is not None:
+            sub_path = _write_sub_pdf(file_path, page_numbers)
+
+        upload_path = sub_path or file_path
+
+        uploaded_file = file_api.upload_file(
+            upload_path,
             display_name=os.path.basename(file_path)
         )
 
         while uploaded_file.state.name == "PROCESSING":
             time.sleep(2)
-            uploaded_file = genai.get_file(uploaded_file.name)
+            uploaded_file = file_api.get_file(uploaded_file.name)
 
         if uploaded_file.state.name == "FAILED":
             raise Exception("Gemini PDF processing failed.")
 
-        model = genai.GenerativeModel("gemini-2.5-flash")
-
-        prompt = """
-        Extract ALL readable text from this PDF.
-        Do not summarize.
-        Do not skip anything.
-        Maintain structure.
-        Return plaintext only.
-        """
-
-        response = model.generate_content([prompt, uploaded_file])
+        response = file_api.generate_content([OCR_PROMPT, uploaded_file])
 
-        print("✅ Extracted using Gemini AI")
-        return response.text
+        return _split_pages(response.text or "", len(page_numbers) if page_numbers is not None else None)
 
     except Exception as e:
         print("❌ Gemini extraction failed:", e)
+        raise Exception(f"Gemini OCR failed for pages {page_numbers or 'all'}: {e}")
+
+    finally:
+        if sub_path:
+            os.remove(sub_path)
+
+
+def load_pdf(file_path: str):
 
-    raise Exception("❌ All extraction methods failed.")
\ No newline at end of file
+    return "".join(text + "\n" for text in iter_pages(file_path))
@@ -0,0 +1,9 @@
+import hashlib
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -1,44 +1,214 @@
+import time
 import uuid
-from app.services.gemini_pdf_loader import load_pdf
-from app.services.chunking import split_into_concepts
-from app.embeddings.embedder import generate_embedding
-from app.vectorstore.qdrant_client import client, create_collection
+import hashlib
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from app.config import EMBED_BATCH_SIZE, UPSERT_BATCH_SIZE, PDF_PAGE_WORKERS
+from app.services.gemini_pdf_loader import iter_pages
+from app.services.chunking import iter_chunks, ChunkStats
+from app.embeddings.embedder import generate_embeddings
+from app.vectorstore.qdrant_client import (
+    create_collection,
+    upsert_points,
+    flush_points,
+    existing_point_ids,
+    delete_stale_chapter_points,
+    count_chapter_points
+)
+from app.vectorstore.catalog import record_chapter
 from qdrant_client.models import PointStruct
 
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "olympiad-ai-engine/concept")
 
-def ingest_pdf(file_path: str, grade: int, subject: str, chapter_name: str):
+
+def _batched(items, size):
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def point_id(grade: int, subject: str, chapter_name: str, content: str):
+
+    # Same chunk of the same chapter always maps to the same point
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    return str(uuid.uuid5(
+        POINT_ID_NAMESPACE,
+        f"{grade}/{subject.lower()}/{chapter_name.lower()}/{content_hash}"
+    ))
+
+
+def _report(progress, key: str, amount: int):
+    if progress is not None:
+        progress(key, amount)
+
+
+def _counted_pages(pages, progress):
+    for page in pages:
+        _report(progress, "pages_extracted", 1)
+        yield page
+
+
+def extract_chunks(file_path: str, page_workers: int = 1):
+
+    # Runs in a worker process, so page progress goes back with the result
+    stats = ChunkStats()
+    pages = 0
+
+    def counted():
+        nonlocal pages
+        for page in iter_pages(file_path, workers=page_workers):
+            pages += 1
+            yield page
+
+    chunks = list(iter_chunks(counted(), stats=stats))
+
+    return chunks, stats.summary(), pages
+
+
+def ingest_pdf(
+    file_path: str,
+    grade: int,
+    subject: str,
+    chapter_name: str,
+    embed_batch_size: int = EMBED_BATCH_SIZE,
+    upsert_batch_size: int = UPSERT_BATCH_SIZE,
+    page_workers: int = PDF_PAGE_WORKERS,
+    replace_chapter: bool = True,
+    progress=None
+):
+
+    # Pages stream into the chunker and chunks stream into the embedder,
+    # so the full document text is never materialised.
+    stats = ChunkStats()
+    pages = _counted_pages(iter_pages(file_path, workers=page_workers), progress)
+    concepts = iter_chunks(pages, stats=stats)
+
+    result = ingest_chunks(
+        concepts,
+        grade=grade,
+        subject=subject,
+        chapter_name=chapter_name,
+        embed_batch_size=embed_batch_size,
+        upsert_batch_size=upsert_batch_size,
+        replace_chapter=replace_chapter,
+        progress=progress
+    )
+
+    result["chunk_stats"] = stats.summary()
+
+    return result
+
+
+def ingest_chunks(
+    concepts,
+    grade: int,
+    subject: str,
+    chapter_name: str,
+    embed_batch_size: int = EMBED_BATCH_SIZE,
+    upsert_batch_size: int = UPSERT_BATCH_SIZE,
+    replace_chapter: bool = True,
+    progress=None
+):
 
     collection_name = f"olympiad_grade_{grade}"
 
     create_collection(collection_name)
 
-    text = load_pdf(file_path)
-
-    concepts = split_into_concepts(text)
-
-    points = []
-
-    for concept in concepts:
-        points.append(
-            PointStruct(
-                id=str(uuid.uuid4()),
-                vector=generate_embedding(concept),
-                payload={
-                    "grade": grade,
-                    "subject": subject.lower(),
-                    "chapter_name": chapter_name.lower(),
-                    "content": concept,
-                    "type": "concept"
-                }
-            )
+    started = time.perf_counter()
+    total = 0
+    embedded = 0
+    chapter_ids = set()
+
+    def upload(points):
+        upsert_points(collection_name, points)
+        _report(progress, "points_upserted", len(points))
+
+    # Upserts run on a single background thread so batch N goes to
+    # Qdrant while batch N+1 is being encoded.
+    with ThreadPoolExecutor(max_workers=1) as uploader:
+
+        pending = None
+
+        for batch in _batched(concepts, upsert_batch_size):
+
+            total += len(batch)
+            _report(progress, "chunks_seen", len(batch))
+
+            # Duplicate chunks inside a chapter collapse onto one ID
+            by_id = {}
+            for concept in batch:
+                pid = point_id(grade, subject, chapter_name, concept)
+                if pid not in chapter_ids:
+                    by_id[pid] = concept
+            chapter_ids.update(by_id)
+
+            # Unchanged chunks are already stored under the same ID
+            stored = existing_point_ids(collection_name, list(by_id))
+            new_ids = [pid for pid in by_id if pid not in stored]
+
+            if not new_ids:
+                continue
+
+            new_concepts = [by_id[pid] for pid in new_ids]
+
+            vectors = generate_embeddings(new_concepts, batch_size=embed_batch_size)
+            _report(progress, "chunks_embedded", len(new_concepts))
+
+            points = [
+                PointStruct(
+                    id=pid,
+                    vector=vector,
+                    payload={
+                        "grade": grade,
+                        "subject": subject.lower(),
+                        "chapter_name": chapter_name.lower(),
+                        "content": concept,
+                        "type": "concept"
+                    }
+                )
+                for pid, concept, vector in zip(new_ids, new_concepts, vectors)
+            ]
+
+            if pending is not None:
+                pending.result()
+
+            pending = uploader.submit(upload, points)
+            embedded += len(points)
+
+        if pending is not None:
+            pending.result()
+
+    removed = 0
+
+    if replace_chapter:
+        # Also writes any points the vector store buffered, in the same pass
+        removed = delete_stale_chapter_points(
+            collection_name,
+            subject=subject,
+            chapter_name=chapter_name,
+            keep_ids=list(chapter_ids)
+        )
+        chapter_points = len(chapter_ids)
+    else:
+        flush_points(collection_name)
+        chapter_points = count_chapter_points(
+            collection_name,
+            subject=subject,
+            chapter_name=chapter_name
         )
 
-    client.upsert(
-        collection_name=collection_name,
-        points=points
-    )
+    # Keeps /grades, /subjects and /chapters current without scanning Qdrant
+    record_chapter(grade, subject, chapter_name, chapter_points)
+
+    elapsed = time.perf_counter() - started
 
     return {
         "status": "Ingestion Complete",
-        "chunks": len(points)
-    }
\ No newline at end of file
+        "chunks": total,
+        "embedded": embedded,
+        "unchanged": len(chapter_ids) - embedded,
+        "removed": removed,
+        "seconds": round(elapsed, 2),
+        "chunks_per_sec": round(total / elapsed, 2) if elapsed > 0 else 0
+    }
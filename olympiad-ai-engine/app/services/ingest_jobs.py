@@ -0,0 +1,452 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import argparse
+import threading
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from app.config import (
+    INGEST_JOB_WORKERS,
+    INGEST_JOB_QUEUE_LIMIT,
+    INGEST_JOB_HISTORY,
+    INGEST_JOB_DB_PATH,
+    INGEST_JOB_RUNNER,
+    INGEST_JOB_POLL_SECONDS,
+    INGEST_JOB_HEARTBEAT_SECONDS,
+    INGEST_JOB_LEASE_SECONDS
+)
+
+# Job state lives in SQLite under the data directory, so every gunicorn
+# worker sees the same jobs, queue limit and progress.
+#
+# INGEST_JOB_RUNNER=inline    the API worker that accepts a job runs it
+# INGEST_JOB_RUNNER=external  the API only queues jobs; a separate process
+#                             runs them, away from /ask traffic:
+#
+#   python -m app.services.ingest_jobs
+#
+# gunicorn.conf.py defaults to external and starts that process itself.
+#
+# Every process that runs jobs renews a lease in the runners table. When a
+# process stops (restart, crash, deploy), its running jobs are failed and
+# their uploads deleted, and its queued jobs are taken over, by whichever
+# runner notices the lapsed lease first.
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+# --------------------------------------------------
+# SQLITE STORE
+# --------------------------------------------------
+
+def _connect(db_path: str = INGEST_JOB_DB_PATH):
+
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            kwargs TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            progress TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            runner TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS runners (
+            name TEXT PRIMARY KEY,
+            heartbeat_at REAL NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+def _to_dict(row):
+
+    if row is None:
+        return None
+
+    (job_id, kind, params, _, status, created_at, started_at,
+     finished_at, progress, result, error, runner) = row
+
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "params": json.loads(params),
+        "status": status,
+        "created_at": created_at,
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "progress": json.loads(progress),
+        "result": json.loads(result) if result else None,
+        "error": error,
+        "runner": runner
+    }
+
+
+def _update(job_id: str, **fields):
+
+    columns = ", ".join(f"{name} = ?" for name in fields)
+
+    with closing(_connect()) as conn:
+        conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+
+def _evict_finished(conn):
+    conn.execute(
+        """
+        DELETE FROM jobs WHERE id IN (
+            SELECT id FROM jobs WHERE status IN ('completed', 'failed')
+            ORDER BY created_at DESC LIMIT -1 OFFSET ?
+        )
+        """,
+        (INGEST_JOB_HISTORY,)
+    )
+
+
+# --------------------------------------------------
+# PROGRESS
+# --------------------------------------------------
+
+class JobProgress:
+
+    # Counters are kept in memory and written to the store at most every
+    # flush_seconds, since the pipeline reports once per page and batch
+    def __init__(self, job_id: str, flush_seconds: float = 0.5):
+        self.job_id = job_id
+        self.flush_seconds = flush_seconds
+        self.counts = {
+            "pages_extracted": 0,
+            "chunks_seen": 0,
+            "chunks_embedded": 0,
+            "points_upserted": 0
+        }
+        self._flushed_at = 0.0
+        self._lock = threading.Lock()
+
+    def report(self, key: str, amount: int):
+        # Called from the ingest pipeline, including its upload thread
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + amount
+            if time.monotonic() - self._flushed_at < self.flush_seconds:
+                return
+            self._flushed_at = time.monotonic()
+            progress = json.dumps(self.counts)
+        _update(self.job_id, progress=progress)
+
+    def flush(self):
+        with self._lock:
+            progress = json.dumps(self.counts)
+        _update(self.job_id, progress=progress)
+
+
+# --------------------------------------------------
+# QUEUE
+# --------------------------------------------------
+
+_executor = ThreadPoolExecutor(
+    max_workers=INGEST_JOB_WORKERS,
+    thread_name_prefix="ingest-job"
+)
+_runner_name = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def submit_job(kind: str, params: dict, **kwargs):
+
+    if kind not in JOB_TARGETS:
+        raise Exception(f"Unknown ingest job kind: {kind}")
+
+    job_id = uuid.uuid4().hex
+    inline = INGEST_JOB_RUNNER == "inline"
+
+    if inline:
+        # The job is owned by this process, so it must hold a lease first
+        start_heartbeat()
+
+    with closing(_connect()) as conn:
+
+        # IMMEDIATE: the limit check and insert are atomic across workers
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            active = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+
+            if active >= INGEST_JOB_QUEUE_LIMIT:
+                raise IngestQueueFull("Ingestion queue is full, try again later.")
+
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, kwargs, status, created_at, progress, runner) VALUES (?, ?, ?, ?, 'queued', ?, '{}', ?)",
+                (job_id, kind, json.dumps(params), json.dumps(kwargs), time.time(), _runner_name if inline else None)
+            )
+            _evict_finished(conn)
+            conn.execute("COMMIT")
+
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    if inline:
+        _executor.submit(_run_job, job_id)
+
+    return get_job(job_id)
+
+
+def _claim(job_id: str = None):
+
+    # Marks one queued job as running; None when there is nothing to take
+    with closing(_connect()) as conn:
+
+        conn.execute("BEGIN IMMEDIATE")
+
+        if job_id is None:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE id = ? AND status = 'queued'", (job_id,)
+            ).fetchone()
+
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+
+        conn.execute(
+            "UPDATE jobs SET status = 'running', started_at = ?, runner = ? WHERE id = ?",
+            (time.time(), _runner_name, row[0])
+        )
+        conn.execute("COMMIT")
+
+        return conn.execute(
+            "SELECT kind, kwargs FROM jobs WHERE id = ?", (row[0],)
+        ).fetchone() + (row[0],)
+
+
+def _run_job(job_id: str):
+    claimed = _claim(job_id)
+    if claimed is not None:
+        _execute(*claimed)
+
+
+def _execute(kind: str, kwargs: str, job_id: str):
+
+    progress = JobProgress(job_id)
+
+    try:
+        result = JOB_TARGETS[kind](progress=progress.report, **json.loads(kwargs))
+        progress.flush()
+        _update(job_id, status="completed", result=json.dumps(result), finished_at=time.time())
+
+    except Exception as e:
+        print(f"❌ Ingest job {job_id} failed:", e)
+        progress.flush()
+        _update(job_id, status="failed", error=str(e), finished_at=time.time())
+
+
+def get_job(job_id: str):
+    with closing(_connect()) as conn:
+        return _to_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+
+def list_jobs():
+    with closing(_connect()) as conn:
+        return [
+            _to_dict(row)
+            for row in conn.execute("SELECT * FROM jobs ORDER BY created_at DESC").fetchall()
+        ]
+
+
+# --------------------------------------------------
+# RUNNER LEASES
+# --------------------------------------------------
+
+_heartbeat_thread = None
+_heartbeat_lock = threading.Lock()
+
+
+def _beat():
+    with closing(_connect()) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO runners (name, heartbeat_at) VALUES (?, ?)",
+            (_runner_name, time.time())
+        )
+
+
+def _heartbeat_loop(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            _beat()
+            reclaim_orphaned_jobs()
+        except Exception as e:
+            print("❌ Ingest job heartbeat failed:", e)
+
+
+def start_heartbeat(interval: float = INGEST_JOB_HEARTBEAT_SECONDS):
+
+    # Takes this process's lease, picks up jobs left by stopped runners,
+    # then keeps both going in the background
+    global _heartbeat_thread
+
+    with _heartbeat_lock:
+        if _heartbeat_thread is not None:
+            return
+
+        _beat()
+        reclaim_orphaned_jobs()
+
+        _heartbeat_thread = threading.Thread(
+            target=_heartbeat_loop,
+            args=(interval,),
+            name="ingest-job-heartbeat",
+            daemon=True
+        )
+        _heartbeat_thread.start()
+
+
+def start_job_runner():
+    # API startup: only inline mode runs jobs in this process
+    if INGEST_JOB_RUNNER == "inline":
+        start_heartbeat()
+
+
+def _discard_upload(kind: str, kwargs: str):
+    file_path = json.loads(kwargs).get("file_path")
+    if kind == "pdf" and file_path and os.path.exists(file_path):
+        os.remove(file_path)
+
+
+def reclaim_orphaned_jobs(lease_seconds: float = INGEST_JOB_LEASE_SECONDS):
+
+    cutoff = time.time() - lease_seconds
+    failed = []
+    adopted = []
+
+    with closing(_connect()) as conn:
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                """
+                SELECT j.id, j.status, j.kind, j.kwargs FROM jobs j
+                LEFT JOIN runners r ON r.name = j.runner
+                WHERE j.status IN ('queued', 'running') AND j.runner IS NOT NULL
+                AND (r.heartbeat_at IS NULL OR r.heartbeat_at < ?)
+                """,
+                (cutoff,)
+            ).fetchall()
+
+            for job_id, status, kind, kwargs in rows:
+                if status == "running":
+                    # Partly ingested; the chapter can simply be ingested again
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                        ("Runner stopped before the job finished", time.time(), job_id)
+                    )
+                    failed.append((kind, kwargs))
+                elif INGEST_JOB_RUNNER == "inline":
+                    conn.execute("UPDATE jobs SET runner = ? WHERE id = ?", (_runner_name, job_id))
+                    adopted.append(job_id)
+                else:
+                    # Back to the shared queue for the external runners
+                    conn.execute("UPDATE jobs SET runner = NULL WHERE id = ?", (job_id,))
+
+            conn.execute("DELETE FROM runners WHERE heartbeat_at < ?", (cutoff,))
+            conn.execute("COMMIT")
+
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    for kind, kwargs in failed:
+        _discard_upload(kind, kwargs)
+
+    for job_id in adopted:
+        _executor.submit(_run_job, job_id)
+
+    if rows:
+        print(f"🛠️ Reclaimed {len(rows)} ingest jobs from stopped runners ({len(failed)} failed)")
+
+    return [row[0] for row in rows]
+
+
+def run_worker(poll_seconds: float = INGEST_JOB_POLL_SECONDS, workers: int = INGEST_JOB_WORKERS):
+
+    print(f"🛠️ Ingest job runner {_runner_name} started ({workers} workers)")
+    start_heartbeat()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest-job") as pool:
+
+        running = set()
+
+        while True:
+            running = {future for future in running if not future.done()}
+
+            if len(running) < workers:
+                claimed = _claim()
+                if claimed is not None:
+                    running.add(pool.submit(_execute, *claimed))
+                    continue
+
+            time.sleep(poll_seconds)
+
+
+# --------------------------------------------------
+# JOB TARGETS
+# --------------------------------------------------
+
+def ingest_uploaded_pdf(file_path: str, progress=None, **kwargs):
+
+    # Imported here so the API process only loads the ingest stack on use
+    from app.services.ingest import ingest_pdf
+
+    try:
+        return ingest_pdf(file_path=file_path, progress=progress, **kwargs)
+    finally:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def ingest_pdf_folder(progress=None, **kwargs):
+
+    from app.services.bulk_ingest import ingest_all_pdfs
+
+    return ingest_all_pdfs(progress=progress, **kwargs)
+
+
+# Jobs are stored by kind so any process can run them
+JOB_TARGETS = {
+    "pdf": ingest_uploaded_pdf,
+    "bulk": ingest_pdf_folder
+}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Run queued ingestion jobs")
+    parser.add_argument("--workers", type=int, default=INGEST_JOB_WORKERS)
+    parser.add_argument("--poll-seconds", type=float, default=INGEST_JOB_POLL_SECONDS)
+    args = parser.parse_args()
+
+    run_worker(args.poll_seconds, args.workers)
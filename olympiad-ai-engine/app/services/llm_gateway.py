@@ -0,0 +1,303 @@
+import re
+import json
+import time
+import asyncio
+import itertools
+import threading
+from collections import deque
+from app.config import (
+    GEMINI_API_KEY,
+    LLM_MODEL,
+    LLM_TRANSPORT,
+    LLM_TIMEOUT_SECONDS,
+    LLM_POOL_SIZE,
+    LLM_KEEPALIVE_SECONDS,
+    LLM_LOCAL_LATENCY_MS
+)
+
+# Every engine calls Gemini through this module. One genai.Client per
+# process owns pooled keep-alive HTTP connections (sync and async), so
+# requests reuse TCP/TLS sessions instead of building a client per call.
+#
+# LLM_TRANSPORT=local swaps Gemini for an offline stand-in: prompts that
+# embed a JSON template get that template back (its question list filled
+# with as many distinct questions as the prompt asks for), anything else
+# gets canned text, after LLM_LOCAL_LATENCY_MS. Use it for load tests and to measure
+# the per-call overhead of everything around the model.
+
+_client = None
+_httpx_clients = []
+_client_lock = threading.Lock()
+
+
+def is_configured():
+    return LLM_TRANSPORT == "local" or bool(GEMINI_API_KEY)
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from google import genai
+                from google.genai import types
+
+                if not GEMINI_API_KEY:
+                    raise Exception("GEMINI_API_KEY not found")
+
+                limits = httpx.Limits(
+                    max_connections=LLM_POOL_SIZE,
+                    max_keepalive_connections=LLM_POOL_SIZE,
+                    keepalive_expiry=LLM_KEEPALIVE_SECONDS
+                )
+                timeout = httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10.0)
+
+                sync_http = httpx.Client(limits=limits, timeout=timeout)
+                async_http = httpx.AsyncClient(limits=limits, timeout=timeout)
+                _httpx_clients[:] = [sync_http, async_http]
+
+                _client = genai.Client(
+                    api_key=GEMINI_API_KEY,
+                    http_options=types.HttpOptions(
+                        timeout=int(LLM_TIMEOUT_SECONDS * 1000),
+                        httpx_client=sync_http,
+                        httpx_async_client=async_http
+                    )
+                )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is None:
+        return
+    sync_http, async_http = _httpx_clients
+    sync_http.close()
+    await async_http.aclose()
+    _client = None
+
+
+# --------------------------------------------------
+# LOCAL STAND-IN TRANSPORT
+# --------------------------------------------------
+
+class LocalResponse:
+
+    # Mirrors the one attribute engines read from a genai response
+    def __init__(self, text: str):
+        self.text = text
+
+
+LOCAL_CANNED_TEXT = (
+    "Key concept: this is a locally generated answer.\n"
+    "Step 1: Read the question carefully.\n"
+    "Step 2: Apply the concept from the lesson.\n"
+    "Short trick: eliminate options that contradict the concept."
+)
+
+_decoder = json.JSONDecoder()
+
+
+def _embedded_json(prompt: str):
+    # First '{' that starts a complete JSON object in the prompt
+    for match in re.finditer(r"\{", prompt):
+        try:
+            value, _ = _decoder.raw_decode(prompt, match.start())
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+_requested_count = re.compile(r"(?:Generate|Number of Questions:)\s*(\d+)")
+_local_question_ids = itertools.count(1)
+
+
+def _local_questions(sample: dict, count: int):
+    # Numbered across calls, so shards of one request never collide
+    questions = []
+    for i in range(count):
+        n = next(_local_question_ids)
+        options = [f"Local option {n}{letter}" for letter in "ABCD"]
+        questions.append({
+            **sample,
+            "id": i + 1,
+            "question": f"Local question {n}?",
+            "options": options,
+            "correct_answer": options[0]
+        })
+    return questions
+
+
+def _local_text(prompt: str):
+
+    template = _embedded_json(prompt)
+    if template is None:
+        return LOCAL_CANNED_TEXT
+
+    sample = template.get("questions")
+    count = _requested_count.search(prompt)
+
+    if count and isinstance(sample, list) and sample and isinstance(sample[0], dict):
+        template["questions"] = _local_questions(sample[0], int(count.group(1)))
+
+    return json.dumps(template)
+
+
+# --------------------------------------------------
+# METRICS
+# --------------------------------------------------
+
+_metrics_lock = threading.Lock()
+_metrics = {}
+
+
+def _record(label: str, seconds: float, ok: bool, chars: int):
+    with _metrics_lock:
+        entry = _metrics.setdefault(label, {
+            "calls": 0,
+            "errors": 0,
+            "total_seconds": 0.0,
+            "response_chars": 0,
+            "latencies": deque(maxlen=1000)
+        })
+        entry["calls"] += 1
+        entry["errors"] += 0 if ok else 1
+        entry["total_seconds"] += seconds
+        entry["response_chars"] += chars
+        entry["latencies"].append(seconds)
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def llm_stats():
+    with _metrics_lock:
+        stats = {}
+        for label, entry in _metrics.items():
+            latencies = list(entry["latencies"])
+            stats[label] = {
+                "calls": entry["calls"],
+                "errors": entry["errors"],
+                "mean_ms": round(entry["total_seconds"] / entry["calls"] * 1000, 1),
+                "p50_ms": round(_percentile(latencies, 0.50) * 1000, 1),
+                "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+                "response_chars": entry["response_chars"]
+            }
+        return {"transport": LLM_TRANSPORT, "model": LLM_MODEL, "calls": stats}
+
+
+# --------------------------------------------------
+# GENERATE
+# --------------------------------------------------
+
+def _config(json_output: bool):
+    return {"response_mime_type": "application/json"} if json_output else None
+
+
+def generate(prompt: str, *, label: str = "default", json_output: bool = False, model: str = LLM_MODEL):
+
+    started = time.perf_counter()
+    response = None
+
+    try:
+        if LLM_TRANSPORT == "local":
+            time.sleep(LLM_LOCAL_LATENCY_MS / 1000.0)
+            response = LocalResponse(_local_text(prompt))
+        else:
+            response = get_client().models.generate_content(
+                model=model,
+                contents=prompt,
+                config=_config(json_output)
+            )
+        return response
+
+    finally:
+        _record(
+            label,
+            time.perf_counter() - started,
+            response is not None,
+            len(response.text or "") if response is not None else 0
+        )
+
+
+async def generate_async(prompt: str, *, label: str = "default", json_output: bool = False, model: str = LLM_MODEL):
+
+    started = time.perf_counter()
+    response = None
+
+    try:
+        if LLM_TRANSPORT == "local":
+            await asyncio.sleep(LLM_LOCAL_LATENCY_MS / 1000.0)
+            response = LocalResponse(_local_text(prompt))
+        else:
+            response = await get_client().aio.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=_config(json_output)
+            )
+        return response
+
+    finally:
+        _record(
+            label,
+            time.perf_counter() - started,
+            response is not None,
+            len(response.text or "") if response is not None else 0
+        )
+
+
+def _local_chunks(text: str, size: int = 4):
+    words = text.split(" ")
+    for start in range(0, len(words), size):
+        yield " ".join(words[start:start + size]) + (" " if start + size < len(words) else "")
+
+
+async def generate_stream_async(prompt: str, *, label: str = "default", model: str = LLM_MODEL):
+
+    # Yields text chunks as they arrive. Closing the generator early (client
+    # went away) closes the underlying HTTP stream.
+    started = time.perf_counter()
+    first_chunk = None
+    chars = 0
+    ok = False
+
+    try:
+        if LLM_TRANSPORT == "local":
+            chunks = list(_local_chunks(_local_text(prompt)))
+            for chunk in chunks:
+                await asyncio.sleep(LLM_LOCAL_LATENCY_MS / 1000.0 / len(chunks))
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - started
+                chars += len(chunk)
+                yield chunk
+        else:
+            stream = await get_client().aio.models.generate_content_stream(
+                model=model,
+                contents=prompt
+            )
+            try:
+                async for response in stream:
+                    if not response.text:
+                        continue
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - started
+                    chars += len(response.text)
+                    yield response.text
+            finally:
+                await stream.aclose()
+        ok = True
+
+    except (GeneratorExit, asyncio.CancelledError):
+        # Caller stopped reading; not a model failure
+        ok = True
+        raise
+
+    finally:
+        _record(label, time.perf_counter() - started, ok, chars)
+        if first_chunk is not None:
+            _record(f"{label}.first_chunk", first_chunk, True, 0)
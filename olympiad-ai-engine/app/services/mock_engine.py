@@ -1,27 +1,14 @@
-import os
 import json
 import re
 import random
-from google import genai
+from app.services import llm_gateway
+from app.services.sharded_generation import generate_sharded_async
 
 
 # ==============================
 # 🔥 LLM MOCK GENERATOR
 # ==============================
-def generate_mock_exam_llm(
-    context,
-    chapter_name,
-    num_questions,
-    duration_minutes,
-    grade,
-    subject
-):
-
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise Exception("GEMINI_API_KEY not found")
-
-    client = genai.Client(api_key=api_key)
+def _build_prompt(context, chapter_name, num_questions, duration_minutes, grade, subject):
 
     prompt = f"""
 You are an Olympiad Exam Paper Generator.
@@ -56,11 +43,10 @@ Context:
 {context}
 """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config={"response_mime_type": "application/json"}
-    )
+    return prompt
+
+
+def _parse_response(response):
 
     if not response.text:
         raise Exception("Empty LLM response")
@@ -73,7 +59,43 @@ Context:
         if match:
             return json.loads(match.group(0))
         raise Exception("Invalid JSON returned")
-        
+
+
+def _fields(chapter_name, duration_minutes, grade, subject):
+    return {
+        "intent": "mock_exam",
+        "grade": grade,
+        "subject": subject,
+        "chapter": chapter_name,
+        "duration_minutes": duration_minutes
+    }
+
+
+async def generate_mock_exam_llm_async(
+    context,
+    chapter_name,
+    num_questions,
+    duration_minutes,
+    grade,
+    subject
+):
+
+    if not llm_gateway.is_configured():
+        raise Exception("GEMINI_API_KEY not found")
+
+    async def generate_shard(shard_context, count):
+        prompt = _build_prompt(shard_context, chapter_name, count, duration_minutes, grade, subject)
+        response = await llm_gateway.generate_async(prompt, label="mock", json_output=True)
+        return _parse_response(response)
+
+    return await generate_sharded_async(
+        generate_shard,
+        num_questions,
+        context,
+        fields=_fields(chapter_name, duration_minutes, grade, subject)
+    )
+
+
 
 # ==============================
 # 🧠 FALLBACK GENERATOR
@@ -1,8 +1,40 @@
+from concurrent.futures import ProcessPoolExecutor
 from pypdf import PdfReader
+from app.services.extraction_cache import cached_pages
 
-def load_pdf(file_path: str):
+EXTRACTOR_VERSION = "pypdf-1"
+
+
+def _page_ranges(page_count: int, workers: int):
+    step = max(1, -(-page_count // workers))
+    return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+
+def _extract_range(file_path: str, start: int, stop: int):
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_pages(file_path: str, workers: int = 1):
+    return cached_pages(file_path, EXTRACTOR_VERSION, lambda: _extract_pages(file_path, workers))
+
+
+def _extract_pages(file_path: str, workers: int):
     reader = PdfReader(file_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
-    return text
+
+    if workers <= 1:
+        for page in reader.pages:
+            yield page.extract_text() or ""
+        return
+
+    ranges = _page_ranges(len(reader.pages), workers)
+
+    # Results are consumed in submission order, so pages stay in document order
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_extract_range, file_path, start, stop) for start, stop in ranges]
+        for future in futures:
+            yield from future.result()
+
+
+def load_pdf(file_path: str):
+    return "".join(text + "\n" for text in iter_pages(file_path))
@@ -1,15 +1,11 @@
-import os
 import json
-from google import genai
+from app.services import llm_gateway
 
 def generate_llm_plan(duration_days, chapter_name, grade, subject):
 
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    if not llm_gateway.is_configured():
         raise Exception("GEMINI_API_KEY not found")
 
-    client = genai.Client(api_key=api_key)
-
     prompt = f"""
 You are an AI Academic Study Planner.
 
@@ -35,11 +31,7 @@ Return STRICT JSON format only:
 }}
 """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config={"response_mime_type": "application/json"}
-    )
+    response = llm_gateway.generate(prompt, label="planner", json_output=True)
 
     if not response.text:
         raise Exception("Empty LLM response")
@@ -1,21 +1,25 @@
-import os
-from google import genai
 from google.genai.errors import ClientError
+from app.services import llm_gateway
 
+# Fallback replies returned in place of an answer; never cache these
+ERROR_MESSAGES = (
+    "API key not configured.",
+    "AI returned empty response.",
+    "AI quota exceeded. Please try again later.",
+    "AI service temporarily unavailable."
+)
 
-def generate_answer(context, question):
 
-    api_key = os.getenv("GEMINI_API_KEY")
+def is_error_answer(text):
+    return not text or any(text.endswith(message) for message in ERROR_MESSAGES)
 
-    if not api_key:
-        return "API key not configured."
+
+def _build_prompt(context, question):
 
     # 🔥 LIMIT CONTEXT SIZE (Prevents token overflow crash)
     MAX_CONTEXT_CHARS = 4000
     context = context[:MAX_CONTEXT_CHARS]
 
-    client = genai.Client(api_key=api_key)
-
     prompt = f"""
 You are an AI Olympiad Academic Assistant specialized in Mathematics, Science, Logical Reasoning, and English Olympiads for Classes 1–12.
 
@@ -42,11 +46,41 @@ Question:
 {question}
 """
 
+    return prompt
+
+
+def generate_answer(context, question):
+
+    if not llm_gateway.is_configured():
+        return "API key not configured."
+
+    prompt = _build_prompt(context, question)
+
+    try:
+        response = llm_gateway.generate(prompt, label="qa")
+
+        if not response.text:
+            return "AI returned empty response."
+
+        return response.text.strip()
+
+    except ClientError:
+        return "AI quota exceeded. Please try again later."
+
+    except Exception as e:
+        print("LLM Error:", str(e))
+        return "AI service temporarily unavailable."
+
+
+async def generate_answer_async(context, question):
+
+    if not llm_gateway.is_configured():
+        return "API key not configured."
+
+    prompt = _build_prompt(context, question)
+
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
-        )
+        response = await llm_gateway.generate_async(prompt, label="qa")
 
         if not response.text:
             return "AI returned empty response."
@@ -59,3 +93,27 @@ Question:
     except Exception as e:
         print("LLM Error:", str(e))
         return "AI service temporarily unavailable."
+
+
+async def stream_answer_async(context, question):
+
+    if not llm_gateway.is_configured():
+        yield "API key not configured."
+        return
+
+    prompt = _build_prompt(context, question)
+    stream = llm_gateway.generate_stream_async(prompt, label="qa_stream")
+
+    try:
+        async for chunk in stream:
+            yield chunk
+
+    except ClientError:
+        yield "AI quota exceeded. Please try again later."
+
+    except Exception as e:
+        print("LLM Error:", str(e))
+        yield "AI service temporarily unavailable."
+
+    finally:
+        await stream.aclose()
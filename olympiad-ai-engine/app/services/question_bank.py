@@ -0,0 +1,474 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import argparse
+import threading
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from app.config import (
+    QUESTION_BANK_PATH,
+    QUESTION_BANK_TARGET,
+    QUESTION_BANK_LOW_WATER,
+    QUESTION_BANK_BATCH_SIZE,
+    QUESTION_BANK_WORKERS,
+    QUESTION_BANK_SERVED_DAYS
+)
+from app.services.question_text import normalize_text
+
+# Pre-generated, validated MCQs per (grade, subject, chapter). Mock tests and
+# question papers are sampled from here in milliseconds; the LLM is only
+# called by background top-ups when a chapter's bank runs low.
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+# --------------------------------------------------
+# SQLITE STORE
+# --------------------------------------------------
+
+def _connect(bank_path: str = QUESTION_BANK_PATH):
+
+    directory = os.path.dirname(bank_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(bank_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            grade INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            chapter TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            question TEXT NOT NULL,
+            options TEXT NOT NULL,
+            correct_answer TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            UNIQUE (grade, subject, chapter, fingerprint)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS served (
+            student_id TEXT NOT NULL,
+            question_id INTEGER NOT NULL,
+            served_at REAL NOT NULL,
+            PRIMARY KEY (student_id, question_id)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS served_at_idx ON served (served_at)")
+    return conn
+
+
+def _key(grade, subject, chapter_name):
+    return int(grade), subject.lower(), chapter_name.lower()
+
+
+# --------------------------------------------------
+# VALIDATION / DEDUPLICATION
+# --------------------------------------------------
+
+def fingerprint(question: str, options: list):
+    # Same stem and option set (in any order) is the same question
+    canonical = normalize_text(question) + "|" + "|".join(sorted(normalize_text(o) for o in options))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def validate_question(item: dict, default_difficulty: str = "medium"):
+
+    if not isinstance(item, dict):
+        return None
+
+    question = str(item.get("question") or "").strip()
+    options = item.get("options")
+    answer = str(item.get("correct_answer") or "").strip()
+
+    if not question or not isinstance(options, list) or len(options) != 4:
+        return None
+
+    options = [str(o).strip() for o in options]
+    if not all(options) or len({normalize_text(o) for o in options}) != 4:
+        return None
+
+    # Accept a letter ("B") or the option text with different casing
+    if len(answer) == 1 and answer.upper() in "ABCD":
+        answer = options["ABCD".index(answer.upper())]
+    matches = [o for o in options if normalize_text(o) == normalize_text(answer)]
+    if len(matches) != 1:
+        return None
+
+    difficulty = str(item.get("difficulty") or default_difficulty).lower()
+    if difficulty not in DIFFICULTIES:
+        difficulty = default_difficulty
+
+    return {
+        "question": question,
+        "options": options,
+        "correct_answer": matches[0],
+        "difficulty": difficulty
+    }
+
+
+def add_questions(grade, subject, chapter_name, items: list, default_difficulty: str = "medium"):
+
+    grade, subject, chapter = _key(grade, subject, chapter_name)
+    now = time.time()
+    rows = []
+
+    for item in items:
+        valid = validate_question(item, default_difficulty)
+        if valid is None:
+            continue
+        rows.append((
+            grade, subject, chapter,
+            fingerprint(valid["question"], valid["options"]),
+            valid["question"],
+            json.dumps(valid["options"]),
+            valid["correct_answer"],
+            valid["difficulty"],
+            now
+        ))
+
+    with closing(_connect()) as conn, conn:
+        before = conn.total_changes
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO questions
+            (grade, subject, chapter, fingerprint, question, options, correct_answer, difficulty, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows
+        )
+        added = conn.total_changes - before
+
+    return {"received": len(items), "valid": len(rows), "added": added}
+
+
+def bank_counts(grade, subject, chapter_name):
+
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT difficulty, COUNT(*) FROM questions WHERE grade = ? AND subject = ? AND chapter = ? GROUP BY difficulty",
+            _key(grade, subject, chapter_name)
+        ).fetchall()
+
+    counts = {difficulty: 0 for difficulty in DIFFICULTIES}
+    counts.update(dict(rows))
+    counts["total"] = sum(counts[d] for d in DIFFICULTIES)
+    return counts
+
+
+# --------------------------------------------------
+# SERVED HISTORY
+# --------------------------------------------------
+
+_pruned_at = 0.0
+_prune_lock = threading.Lock()
+
+
+def prune_served(conn, retention_days: float = QUESTION_BANK_SERVED_DAYS, every_seconds: float = 3600):
+
+    # One row per question served: rows older than the retention window are
+    # dropped (they would only rank as "seen longest ago" anyway). Runs at
+    # most once per every_seconds per process.
+    global _pruned_at
+
+    with _prune_lock:
+        now = time.time()
+        if now - _pruned_at < every_seconds:
+            return 0
+        _pruned_at = now
+
+    return conn.execute(
+        "DELETE FROM served WHERE served_at < ?",
+        (now - retention_days * 86400,)
+    ).rowcount
+
+
+# --------------------------------------------------
+# SAMPLING
+# --------------------------------------------------
+
+def _weights(difficulty: str = None):
+    if difficulty in DIFFICULTIES:
+        # Mostly the requested level, a little of the others
+        return {d: (0.6 if d == difficulty else 0.2) for d in DIFFICULTIES}
+    return {d: 1 / len(DIFFICULTIES) for d in DIFFICULTIES}
+
+
+def _balanced(rows: list, count: int, difficulty: str = None):
+
+    pools = {d: [] for d in DIFFICULTIES}
+    for row in rows:
+        pools[row[4]].append(row)
+    for pool in pools.values():
+        random.shuffle(pool)
+
+    weights = _weights(difficulty)
+    quotas = {d: int(count * weights[d]) for d in DIFFICULTIES}
+    for d in sorted(DIFFICULTIES, key=lambda d: -weights[d])[:count - sum(quotas.values())]:
+        quotas[d] += 1
+
+    chosen = []
+    for d in DIFFICULTIES:
+        chosen.extend(pools[d][:quotas[d]])
+        del pools[d][:quotas[d]]
+
+    # A level that ran short is made up from whatever is left
+    leftovers = [row for pool in pools.values() for row in pool]
+    random.shuffle(leftovers)
+    chosen.extend(leftovers[:count - len(chosen)])
+
+    random.shuffle(chosen)
+    return chosen
+
+
+def sample_questions(
+    grade,
+    subject,
+    chapter_name,
+    count: int,
+    student_id: str = None,
+    difficulty: str = None,
+    partial: bool = False,
+    exclude: list = None
+):
+
+    # Returns None when the bank cannot cover the request yet, unless
+    # partial: then as many as it has. exclude lists question stems the
+    # caller already holds.
+    grade_key, subject_key, chapter_key = _key(grade, subject, chapter_name)
+    difficulty = (difficulty or "").lower() or None
+
+    with closing(_connect()) as conn, conn:
+
+        rows = conn.execute(
+            """
+            SELECT q.id, q.question, q.options, q.correct_answer, q.difficulty, s.served_at
+            FROM questions q
+            LEFT JOIN served s ON s.question_id = q.id AND s.student_id = ?
+            WHERE q.grade = ? AND q.subject = ? AND q.chapter = ?
+            """,
+            (student_id or "", grade_key, subject_key, chapter_key)
+        ).fetchall()
+
+        if exclude:
+            held = {normalize_text(question) for question in exclude}
+            rows = [row for row in rows if normalize_text(row[1]) not in held]
+
+        if len(rows) < count:
+            request_top_up(grade, subject, chapter_name)
+            if not partial:
+                return None
+            count = len(rows)
+
+        unseen = [row for row in rows if row[5] is None]
+        chosen = _balanced(unseen, count, difficulty)
+
+        if len(chosen) < count:
+            # Student has seen most of the bank: repeat the longest-ago ones
+            seen = sorted((row for row in rows if row[5] is not None), key=lambda row: row[5])
+            chosen.extend(seen[:count - len(chosen)])
+
+        if student_id:
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO served VALUES (?, ?, ?)",
+                [(student_id, row[0], now) for row in chosen]
+            )
+            prune_served(conn)
+
+    if len(rows) < QUESTION_BANK_LOW_WATER or len(unseen) - count < QUESTION_BANK_LOW_WATER:
+        request_top_up(grade, subject, chapter_name)
+
+    return [
+        {
+            "id": i + 1,
+            "question": row[1],
+            "options": json.loads(row[2]),
+            "correct_answer": row[3]
+        }
+        for i, row in enumerate(chosen)
+    ]
+
+
+# --------------------------------------------------
+# BACKGROUND TOP-UP
+# --------------------------------------------------
+
+_executor = ThreadPoolExecutor(max_workers=QUESTION_BANK_WORKERS, thread_name_prefix="question-bank")
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def _build_prompt(context, chapter_name, grade, subject, count, difficulty, avoid):
+
+    avoid_text = "\n".join(f"- {q}" for q in avoid) or "- (none yet)"
+
+    prompt = f"""
+You are an Olympiad Question Bank Author.
+
+Generate {count} {difficulty} multiple choice questions for Grade {grade} {subject},
+chapter "{chapter_name}", strictly from the lesson context.
+
+Rules:
+- Exactly 4 distinct options per question
+- Only one correct answer, copied exactly from the options
+- Every question must be different from the others and from the existing ones below
+- No explanations
+- Return ONLY valid JSON
+
+Existing questions (do not repeat):
+{avoid_text}
+
+JSON FORMAT:
+
+{{
+  "questions": [
+    {{
+      "question": "Question text",
+      "options": ["A", "B", "C", "D"],
+      "correct_answer": "Correct option text",
+      "difficulty": "{difficulty}"
+    }}
+  ]
+}}
+
+Context:
+{context}
+"""
+
+    return prompt
+
+
+def _chapter_context(grade, subject, chapter_name, limit: int = 30):
+
+    from app.embeddings.embedder import generate_embedding
+    from app.vectorstore.retrieval_cache import search_similar_cached
+
+    return [
+        hit.content for hit in search_similar_cached(
+            grade=grade,
+            subject=subject,
+            chapter_name=chapter_name,
+            query_vector=generate_embedding(chapter_name),
+            limit=limit
+        )
+    ]
+
+
+def _existing_stems(grade, subject, chapter_name, limit: int = 20):
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT question FROM questions WHERE grade = ? AND subject = ? AND chapter = ? ORDER BY RANDOM() LIMIT ?",
+            _key(grade, subject, chapter_name) + (limit,)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def generate_batch(grade, subject, chapter_name, difficulty: str, count: int = QUESTION_BANK_BATCH_SIZE, chunks: list = None):
+
+    from app.services import llm_gateway
+    from app.services.mock_engine import _parse_response
+
+    chunks = chunks if chunks is not None else _chapter_context(grade, subject, chapter_name)
+
+    # A different slice of the chapter each batch spreads questions across it
+    sample = random.sample(chunks, min(len(chunks), 8))
+    context = "\n\n".join(sample)[:4000]
+
+    prompt = _build_prompt(
+        context, chapter_name, grade, subject, count, difficulty,
+        _existing_stems(grade, subject, chapter_name)
+    )
+
+    response = llm_gateway.generate(prompt, label="question_bank", json_output=True)
+    data = _parse_response(response)
+
+    return add_questions(grade, subject, chapter_name, data.get("questions", []), difficulty)
+
+
+def fill_bank(grade, subject, chapter_name, target: int = QUESTION_BANK_TARGET, max_batches: int = 20):
+
+    chunks = None
+    barren = 0
+
+    for _ in range(max_batches):
+        counts = bank_counts(grade, subject, chapter_name)
+        if counts["total"] >= target:
+            break
+
+        if chunks is None:
+            chunks = _chapter_context(grade, subject, chapter_name)
+            if not chunks:
+                break
+
+        # Always top up the thinnest difficulty level
+        difficulty = min(DIFFICULTIES, key=lambda d: counts[d])
+
+        try:
+            result = generate_batch(grade, subject, chapter_name, difficulty, chunks=chunks)
+        except Exception as e:
+            print("Question bank generation error:", str(e))
+            result = {"added": 0}
+
+        print(f"🧠 Question bank {grade}/{subject}/{chapter_name} [{difficulty}]: +{result['added']}")
+
+        # The model keeps repeating itself (or failing): stop for now
+        barren = barren + 1 if result["added"] == 0 else 0
+        if barren >= 3:
+            break
+
+    return bank_counts(grade, subject, chapter_name)
+
+
+def _run_top_up(key):
+    try:
+        fill_bank(*key)
+    finally:
+        with _pending_lock:
+            _pending.discard(key)
+
+
+def request_top_up(grade, subject, chapter_name):
+
+    key = _key(grade, subject, chapter_name)
+
+    with _pending_lock:
+        if key in _pending:
+            return False
+        _pending.add(key)
+
+    _executor.submit(_run_top_up, key)
+    return True
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Fill per-chapter question banks")
+    parser.add_argument("--grade", type=int)
+    parser.add_argument("--subject")
+    parser.add_argument("--chapter")
+    parser.add_argument("--target", type=int, default=QUESTION_BANK_TARGET)
+    args = parser.parse_args()
+
+    from app.vectorstore.catalog import list_grades, list_subjects, list_chapters
+
+    # Any level left out means "all of them" from the catalog
+    for grade in [args.grade] if args.grade else [int(g) for g in list_grades()]:
+        for subject in [args.subject] if args.subject else list_subjects(grade):
+            for chapter in [args.chapter] if args.chapter else list_chapters(grade, subject):
+                print(json.dumps({
+                    "grade": grade,
+                    "subject": subject,
+                    "chapter": chapter,
+                    "counts": fill_bank(grade, subject, chapter, args.target)
+                }))
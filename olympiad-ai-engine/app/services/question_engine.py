@@ -1,8 +1,4 @@
-import os
-from google import genai
-
-_api_key = os.getenv("GEMINI_API_KEY")
-client = genai.Client(api_key=_api_key)
+from app.services import llm_gateway
 
 
 def generate_questions(context: str, difficulty: str, count: int = 5):
@@ -24,9 +20,6 @@ Context:
 {context}
 """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt
-    )
+    response = llm_gateway.generate(prompt, label="questions")
 
     return response.text
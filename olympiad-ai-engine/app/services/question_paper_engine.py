@@ -1,11 +1,11 @@
-import os
 import json
 import re
-from google import genai
 from google.genai.errors import ClientError
+from app.services import llm_gateway
+from app.services.sharded_generation import generate_sharded_async
 
 
-def generate_question_paper_llm(
+def _build_prompt(
     context,
     chapter_name,
     num_questions,
@@ -16,15 +16,8 @@ def generate_question_paper_llm(
     difficulty_level
 ):
 
-    api_key = os.getenv("GEMINI_API_KEY")
-
-    if not api_key:
-        raise Exception("API key not configured.")
-
     context = context[:4000]
 
-    client = genai.Client(api_key=api_key)
-
     prompt = f"""
 You are an AI School Question Paper Generator.
 
@@ -72,29 +65,79 @@ Return STRICT JSON format only:
 }}
 """
 
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
-        )
+    return prompt
+
+
+def _parse_response(response):
+
+    if not response.text:
+        raise Exception("Empty response from Gemini")
+
+    text = response.text.strip()
+
+    # 🔥 PRODUCTION SAFE JSON EXTRACTION
+    json_match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not json_match:
+        raise Exception("No valid JSON found in Gemini response")
+
+    clean_json = json_match.group()
+
+    return json.loads(clean_json)
+
+
+def _fields(chapter_name, duration_minutes, grade, subject, marks_per_question, difficulty_level):
+    return {
+        "grade": grade,
+        "subject": subject,
+        "chapter": chapter_name,
+        "difficulty_level": difficulty_level,
+        "duration_minutes": duration_minutes,
+        "marks_per_question": marks_per_question
+    }
 
-        if not response.text:
-            raise Exception("Empty response from Gemini")
 
-        text = response.text.strip()
+async def generate_question_paper_llm_async(
+    context,
+    chapter_name,
+    num_questions,
+    duration_minutes,
+    grade,
+    subject,
+    marks_per_question,
+    difficulty_level
+):
+
+    if not llm_gateway.is_configured():
+        raise Exception("API key not configured.")
+
+    async def generate_shard(shard_context, count):
+
+        prompt = _build_prompt(
+            shard_context,
+            chapter_name,
+            count,
+            duration_minutes,
+            grade,
+            subject,
+            marks_per_question,
+            difficulty_level
+        )
 
-        # 🔥 PRODUCTION SAFE JSON EXTRACTION
-        json_match = re.search(r"\{.*\}", text, re.DOTALL)
-        if not json_match:
-            raise Exception("No valid JSON found in Gemini response")
+        try:
+            response = await llm_gateway.generate_async(prompt, label="question_paper")
 
-        clean_json = json_match.group()
+            return _parse_response(response)
 
-        return json.loads(clean_json)
+        except ClientError:
+            raise Exception("Gemini quota exceeded")
 
-    except ClientError:
-        raise Exception("Gemini quota exceeded")
+        except Exception as e:
+            print("Question Paper LLM Error:", str(e))
+            raise Exception("Failed to generate question paper.")
 
-    except Exception as e:
-        print("Question Paper LLM Error:", str(e))
-        raise Exception("Failed to generate question paper.")
\ No newline at end of file
+    return await generate_sharded_async(
+        generate_shard,
+        num_questions,
+        context,
+        fields=_fields(chapter_name, duration_minutes, grade, subject, marks_per_question, difficulty_level)
+    )
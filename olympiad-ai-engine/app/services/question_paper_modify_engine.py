@@ -1,8 +1,6 @@
-import os
 import json
-from google import genai
-#import google.generativeai as genai
 from google.genai.errors import ClientError
+from app.services import llm_gateway
 
 
 def regenerate_question_paper_with_modifications(
@@ -10,13 +8,9 @@ def regenerate_question_paper_with_modifications(
     modification_request: str
 ):
 
-    api_key = os.getenv("GEMINI_API_KEY")
-
-    if not api_key:
+    if not llm_gateway.is_configured():
         raise Exception("API key not configured.")
 
-    client = genai.Client(api_key=api_key)
-
     prompt = f"""
 You are an AI School Question Paper Modifier.
 
@@ -43,10 +37,7 @@ Return STRICT JSON only.
 """
 
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
-        )
+        response = llm_gateway.generate(prompt, label="question_paper_modify")
 
         text = response.text.strip()
 
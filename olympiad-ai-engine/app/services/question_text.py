@@ -0,0 +1,6 @@
+import re
+
+
+def normalize_text(text: str):
+    # Lowercase, punctuation-free, single-spaced: "What's 2+2?" == "whats 2 2"
+    return " ".join(re.sub(r"[^\w\s]", " ", str(text).lower()).split())
@@ -0,0 +1,141 @@
+import math
+import asyncio
+from app.config import (
+    GENERATION_SHARD_SIZE,
+    GENERATION_SHARD_RETRIES,
+    GENERATION_SHARD_CONCURRENCY
+)
+from app.services.question_text import normalize_text
+
+# Large question sets are generated as concurrent shards of at most
+# GENERATION_SHARD_SIZE questions, each prompted with a different slice of
+# the chapter context. Shards are merged with duplicate-question detection
+# and renumbered. Only the shortfall (failed shards, dropped duplicates) is
+# requested again, on a rotated context slice, up to GENERATION_SHARD_RETRIES
+# more rounds. A 50-question paper costs about as long as a 10-question one.
+# A set still short after the retries raises IncompleteGeneration rather
+# than being returned as if it were complete.
+
+
+class IncompleteGeneration(Exception):
+
+    def __init__(self, questions: list, requested: int):
+        super().__init__(f"Generated {len(questions)}/{requested} questions")
+        self.questions = questions
+        self.requested = requested
+
+
+def shard_count(num_questions: int, shard_size: int = GENERATION_SHARD_SIZE):
+    return max(1, math.ceil(num_questions / shard_size))
+
+
+def plan_shards(num_questions: int, shard_size: int = GENERATION_SHARD_SIZE):
+    # Even split: 23 questions at size 10 -> [8, 8, 7], not [10, 10, 3]
+    shards = shard_count(num_questions, shard_size)
+    base, extra = divmod(num_questions, shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def context_slices(context: str, shards: int, max_chars: int = 4000):
+
+    pieces = [p for p in context.split("\n\n") if p.strip()]
+
+    if shards <= 1 or len(pieces) <= 1:
+        return [context[:max_chars]] * shards
+
+    # Round-robin keeps each slice spread across the retrieved chunks
+    return [
+        "\n\n".join(pieces[i::shards] or [pieces[i % len(pieces)]])[:max_chars]
+        for i in range(shards)
+    ]
+
+
+def _jobs(missing: int, slices: list, attempt: int, shard_size: int):
+    return [
+        (slices[(i + attempt) % len(slices)], count)
+        for i, count in enumerate(plan_shards(missing, shard_size))
+    ]
+
+
+def _collect(results: list, merged: list, seen: set, limit: int):
+
+    template = None
+    error = None
+
+    for result in results:
+        if isinstance(result, Exception):
+            print("Generation shard failed:", str(result))
+            error = result
+            continue
+
+        template = result
+        for question in result.get("questions") or []:
+            if len(merged) >= limit:
+                break
+            if not isinstance(question, dict) or not question.get("question"):
+                continue
+            key = normalize_text(question["question"])
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(question)
+
+    return template, error
+
+
+def _check_count(num_questions: int):
+    if num_questions <= 0:
+        raise Exception("num_questions must be positive")
+
+
+def _finish(template: dict, error: Exception, merged: list, num_questions: int, fields: dict):
+
+    if template is None:
+        raise error or Exception("All generation shards failed")
+
+    questions = [{**question, "id": i + 1} for i, question in enumerate(merged)]
+
+    if len(questions) < num_questions:
+        print(f"⚠️ Sharded generation returned {len(questions)}/{num_questions} questions")
+        raise IncompleteGeneration(questions, num_questions)
+
+    # Request metadata wins over whatever one shard's model output echoed back
+    return {**template, **(fields or {}), "questions": questions}
+
+
+async def generate_sharded_async(
+    generate_shard,
+    num_questions: int,
+    context: str,
+    shard_size: int = GENERATION_SHARD_SIZE,
+    retries: int = GENERATION_SHARD_RETRIES,
+    concurrency: int = GENERATION_SHARD_CONCURRENCY,
+    fields: dict = None
+):
+
+    # generate_shard(context, count) -> parsed JSON with a "questions" list
+    _check_count(num_questions)
+    slices = context_slices(context, shard_count(num_questions, shard_size))
+    semaphore = asyncio.Semaphore(concurrency)
+    merged, seen = [], set()
+    template = error = None
+
+    async def run(shard_context, count):
+        async with semaphore:
+            return await generate_shard(shard_context, count)
+
+    for attempt in range(retries + 1):
+        missing = num_questions - len(merged)
+        if missing <= 0:
+            break
+
+        results = await asyncio.gather(
+            *(run(shard_context, count) for shard_context, count in _jobs(missing, slices, attempt, shard_size)),
+            return_exceptions=True
+        )
+
+        shard_template, shard_error = _collect(results, merged, seen, num_questions)
+        template = template or shard_template
+        error = shard_error or error
+
+    return _finish(template, error, merged, num_questions, fields)
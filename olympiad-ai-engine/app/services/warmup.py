@@ -0,0 +1,93 @@
+import time
+import threading
+from app.config import WARMUP_ENABLED, VECTOR_BACKEND, LLM_TRANSPORT
+
+_state = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "steps": {},
+    "error": None
+}
+_lock = threading.Lock()
+
+
+def _step(name: str, func):
+    started = time.perf_counter()
+    func()
+    _state["steps"][name] = round(time.perf_counter() - started, 3)
+
+
+def _warm_embedding_model():
+    from app.embeddings.embedder import get_model
+    # Load and run one real encode so the first /ask does not pay for it
+    get_model().encode(["warmup"], batch_size=1)
+
+
+def _warm_vector_store():
+    if VECTOR_BACKEND == "local":
+        from app.vectorstore.local_index import warm
+        warm()
+        return
+    from app.vectorstore.qdrant_client import get_client
+    get_client()
+
+
+def _warm_catalog():
+    from app.vectorstore.catalog import ensure_catalog, get_catalog
+    # Built here, before traffic, so requests never trigger a rebuild
+    try:
+        ensure_catalog()
+    except Exception as e:
+        print("❌ Catalog rebuild failed, dropdowns stay empty until ingest:", e)
+    get_catalog()
+
+
+def _warm_llm_clients():
+    # Imported for their module-level cost only
+    import app.services.qa_engine  # noqa: F401
+    import app.services.mock_engine  # noqa: F401
+    import app.services.question_paper_engine  # noqa: F401
+    from app.services import llm_gateway
+    if LLM_TRANSPORT != "local" and llm_gateway.is_configured():
+        llm_gateway.get_client()
+
+
+def run_warmup():
+
+    _state["started_at"] = time.time()
+
+    try:
+        _step("embedding_model", _warm_embedding_model)
+        _step("vector_store", _warm_vector_store)
+        _step("catalog", _warm_catalog)
+        _step("llm_clients", _warm_llm_clients)
+        _state["ready"] = True
+        print("✅ Warmup complete:", _state["steps"])
+
+    except Exception as e:
+        print("❌ Warmup failed:", e)
+        _state["error"] = str(e)
+
+    finally:
+        _state["finished_at"] = time.time()
+
+
+def start_warmup():
+
+    with _lock:
+        if _state["started_at"] is not None:
+            return
+
+        if not WARMUP_ENABLED:
+            _state["started_at"] = _state["finished_at"] = time.time()
+            _state["ready"] = True
+            return
+
+        _state["started_at"] = time.time()
+
+    threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+
+
+def readiness():
+    return dict(_state, steps=dict(_state["steps"]))
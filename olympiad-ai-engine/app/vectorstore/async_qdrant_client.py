@@ -0,0 +1,77 @@
+import os
+from dotenv import load_dotenv
+from app.config import SEARCH_SCORE_THRESHOLD, QDRANT_POOL_SIZE, VECTOR_BACKEND
+from app.vectorstore.qdrant_client import _search_filter, _to_hit, active_search_params
+
+load_dotenv()
+
+# One AsyncQdrantClient per worker process; its httpx pool keeps up to
+# QDRANT_POOL_SIZE keep-alive connections to Qdrant for in-flight requests.
+_client = None
+
+
+def get_async_client():
+    global _client
+    if _client is None:
+        import httpx
+        from qdrant_client import AsyncQdrantClient
+        _client = AsyncQdrantClient(
+            url=os.getenv("QDRANT_URL"),
+            api_key=os.getenv("QDRANT_API_KEY"),
+            limits=httpx.Limits(
+                max_connections=QDRANT_POOL_SIZE,
+                max_keepalive_connections=QDRANT_POOL_SIZE
+            )
+        )
+    return _client
+
+
+async def close_async_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+# --------------------------------------------------
+# SEARCH SIMILAR (ASYNC)
+# --------------------------------------------------
+
+async def search_similar_async(
+    *,
+    grade: int,
+    subject: str,
+    query_vector: list,
+    chapter_name: str = None,
+    limit: int = 3,
+    fields: tuple = ("content",),
+    score_threshold: float = SEARCH_SCORE_THRESHOLD
+):
+
+    if VECTOR_BACKEND == "local":
+        # A handful of in-memory dot products; cheaper inline than a thread hop
+        from app.vectorstore.local_index import search_similar
+        return search_similar(
+            grade=grade,
+            subject=subject,
+            query_vector=query_vector,
+            chapter_name=chapter_name,
+            limit=limit,
+            fields=fields,
+            score_threshold=score_threshold
+        )
+
+    collection_name = f"olympiad_grade_{grade}"
+
+    results = await get_async_client().query_points(
+        collection_name=collection_name,
+        query=query_vector,
+        query_filter=_search_filter(subject, chapter_name),
+        limit=limit,
+        with_payload=list(fields),
+        with_vectors=False,
+        score_threshold=score_threshold,
+        search_params=active_search_params()
+    )
+
+    return [_to_hit(point) for point in results.points]
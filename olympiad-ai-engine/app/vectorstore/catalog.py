@@ -0,0 +1,282 @@
+import os
+import json
+import time
+import fcntl
+import asyncio
+import argparse
+import threading
+from contextlib import contextmanager
+from app.config import CATALOG_PATH, VECTOR_BACKEND
+
+# Materialized grade -> subject -> chapter -> chunk count, maintained by
+# ingestion and served to the dropdown endpoints from memory. Each grade
+# also carries a generation counter that ingestion bumps, which caches
+# keyed on a grade's contents use for invalidation.
+#
+# File layout:
+# {
+#   "grades": {"5": {"science": {"animals": 42}}},
+#   "generations": {"5": 3},
+#   "updated_at": 1700000000.0
+# }
+
+_cache = None
+_cache_mtime = None
+_cache_lock = threading.RLock()
+_rebuild_thread = None
+_rebuild_lock = threading.Lock()
+
+
+def _empty():
+    return {"grades": {}, "generations": {}, "updated_at": None}
+
+
+# --------------------------------------------------
+# FILE STORAGE
+# --------------------------------------------------
+
+@contextmanager
+def _file_lock(catalog_path: str):
+    # Serialises writers across API workers and ingestion processes
+    directory = os.path.dirname(catalog_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(catalog_path + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read(catalog_path: str):
+    if not os.path.exists(catalog_path):
+        return None
+    with open(catalog_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write(catalog: dict, catalog_path: str):
+    catalog["updated_at"] = time.time()
+    tmp_path = catalog_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, catalog_path)
+
+
+def _build_views(catalog: dict):
+    # Sorted lists are computed once per reload, not per request
+    grades = catalog["grades"]
+    catalog["views"] = {
+        "grades": sorted(grades),
+        "subjects": {grade: sorted(subjects) for grade, subjects in grades.items()},
+        "chapters": {
+            (grade, subject): sorted(chapters)
+            for grade, subjects in grades.items()
+            for subject, chapters in subjects.items()
+        }
+    }
+    return catalog
+
+
+# --------------------------------------------------
+# IN-MEMORY CACHE
+# --------------------------------------------------
+
+def get_catalog(catalog_path: str = CATALOG_PATH):
+
+    global _cache, _cache_mtime
+
+    try:
+        mtime = os.stat(catalog_path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    if _cache is not None and mtime == _cache_mtime:
+        return _cache
+
+    if mtime is None:
+        # First run on this box: derive the catalog from the vector store in
+        # the background and serve an empty one (generation 0) meanwhile.
+        # Requests never wait on a full scroll.
+        start_background_rebuild(catalog_path)
+        return _build_views(_empty())
+
+    with _cache_lock:
+        catalog = _read(catalog_path) or _empty()
+        _cache = _build_views(catalog)
+        _cache_mtime = mtime
+
+    return _cache
+
+
+def start_background_rebuild(catalog_path: str = CATALOG_PATH):
+
+    global _rebuild_thread
+
+    with _rebuild_lock:
+        if _rebuild_thread is not None and _rebuild_thread.is_alive():
+            return
+        _rebuild_thread = threading.Thread(
+            target=_rebuild_quietly,
+            args=(catalog_path,),
+            name="catalog-rebuild",
+            daemon=True
+        )
+        _rebuild_thread.start()
+
+
+def _rebuild_quietly(catalog_path: str):
+    try:
+        if not os.path.exists(catalog_path):
+            rebuild_catalog(catalog_path)
+    except Exception as e:
+        print("❌ Catalog rebuild failed:", e)
+
+
+def ensure_catalog(catalog_path: str = CATALOG_PATH):
+    # Startup: build the catalog before traffic if this box has none
+    if not os.path.exists(catalog_path):
+        rebuild_catalog(catalog_path)
+
+
+def invalidate():
+    global _cache, _cache_mtime
+    with _cache_lock:
+        _cache = None
+        _cache_mtime = None
+
+
+def list_grades():
+    return get_catalog()["views"]["grades"]
+
+
+def list_subjects(grade: int):
+    return get_catalog()["views"]["subjects"].get(str(grade), [])
+
+
+def list_chapters(grade: int, subject: str):
+    return get_catalog()["views"]["chapters"].get((str(grade), subject.lower()), [])
+
+
+def grade_generation(grade: int):
+    return get_catalog()["generations"].get(str(grade), 0)
+
+
+async def grade_generation_async(grade: int):
+    # The catalog check stats (and on change reads) a file; keep it off the loop
+    return await asyncio.to_thread(grade_generation, grade)
+
+
+# --------------------------------------------------
+# UPDATES FROM INGESTION
+# --------------------------------------------------
+
+def record_chapter(
+    grade: int,
+    subject: str,
+    chapter_name: str,
+    chunk_count: int,
+    catalog_path: str = CATALOG_PATH
+):
+
+    grade_key = str(grade)
+
+    with _file_lock(catalog_path):
+
+        catalog = _read(catalog_path) or _empty()
+
+        subjects = catalog["grades"].setdefault(grade_key, {})
+        chapters = subjects.setdefault(subject.lower(), {})
+
+        if chunk_count > 0:
+            chapters[chapter_name.lower()] = chunk_count
+        else:
+            chapters.pop(chapter_name.lower(), None)
+            if not chapters:
+                subjects.pop(subject.lower(), None)
+
+        catalog["generations"][grade_key] = catalog["generations"].get(grade_key, 0) + 1
+
+        _write(catalog, catalog_path)
+
+    invalidate()
+
+
+def _local_grades():
+    from app.vectorstore import local_index
+    return {
+        name.replace("olympiad_grade_", ""): local_index.chapter_counts(name)
+        for name in local_index.list_collections()
+        if name.startswith("olympiad_grade_")
+    }
+
+
+def _qdrant_grades(page_size: int):
+
+    from app.vectorstore.qdrant_client import get_client
+
+    client = get_client()
+    grades = {}
+
+    for collection in client.get_collections().collections:
+
+        if not collection.name.startswith("olympiad_grade_"):
+            continue
+
+        grade_key = collection.name.replace("olympiad_grade_", "")
+        subjects = grades.setdefault(grade_key, {})
+        offset = None
+
+        # Page through every point, fetching only the two payload keys
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection.name,
+                limit=page_size,
+                offset=offset,
+                with_payload=["subject", "chapter_name"],
+                with_vectors=False
+            )
+
+            for point in points:
+                chapters = subjects.setdefault(point.payload.get("subject"), {})
+                chapter = point.payload.get("chapter_name")
+                chapters[chapter] = chapters.get(chapter, 0) + 1
+
+            if offset is None:
+                break
+
+    return grades
+
+
+def rebuild_catalog(catalog_path: str = CATALOG_PATH, page_size: int = 1000):
+
+    if VECTOR_BACKEND == "local":
+        grades = _local_grades()
+    else:
+        grades = _qdrant_grades(page_size)
+
+    with _file_lock(catalog_path):
+        previous = _read(catalog_path) or _empty()
+        generations = {
+            grade_key: previous["generations"].get(grade_key, 0) + 1
+            for grade_key in set(grades) | set(previous["generations"])
+        }
+        _write({"grades": grades, "generations": generations}, catalog_path)
+
+    invalidate()
+
+    print(f"✅ Catalog rebuilt: {len(grades)} grades")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Grade/subject/chapter catalog")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild from the vector store")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_catalog()
+
+    print(json.dumps(_read(CATALOG_PATH) or _empty(), indent=2))
@@ -0,0 +1,487 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from app.config import LOCAL_INDEX_DIR, LOCAL_INDEX_RETIRE_SECONDS, SEARCH_SCORE_THRESHOLD
+from app.vectorstore.catalog import _file_lock
+
+# In-process vector index used when VECTOR_BACKEND=local. Same interface as
+# the Qdrant functions in qdrant_client.py, no network hop per query.
+#
+# Each collection is a directory; each (subject, chapter) is a partition of
+# L2-normalized float32 vectors in a .npy file that is memory-mapped on
+# load, next to a JSON list of point ids and payloads:
+#
+#   data/local_index/olympiad_grade_5/
+#       manifest.json                 {"vector_size": 384, "partitions": {key: {...}}}
+#       <key>.<version>.npy           float32 [count, vector_size]
+#       <key>.<version>.json          [{"id": ..., "payload": {...}}, ...]
+#
+# Writers rewrite one partition under a file lock and bump its version, so
+# readers in other processes pick up new files on their next manifest stat.
+# Superseded files are listed under "retired" in the manifest and deleted
+# LOCAL_INDEX_RETIRE_SECONDS later, so a reader holding an older manifest
+# can still open them.
+#
+# upsert_points only buffers points in this process; a chapter's partition
+# is written once, by delete_stale_chapter_points or flush_points at the end
+# of its ingest, instead of once per upsert batch.
+
+_collections = {}
+_lock = threading.RLock()
+
+# (collection, partition key) -> {"subject", "chapter_name", "points": {id: (payload, vector)}}
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+class _Partition:
+
+    __slots__ = ("subject", "chapter_name", "version", "ids", "payloads", "vectors", "rows")
+
+    def __init__(self, subject, chapter_name, version, ids, payloads, vectors):
+        self.subject = subject
+        self.chapter_name = chapter_name
+        self.version = version
+        self.ids = ids
+        self.payloads = payloads
+        self.vectors = vectors
+        self.rows = {pid: row for row, pid in enumerate(ids)}
+
+
+def _collection_dir(collection_name: str):
+    return os.path.join(LOCAL_INDEX_DIR, collection_name)
+
+
+def _manifest_path(collection_name: str):
+    return os.path.join(_collection_dir(collection_name), "manifest.json")
+
+
+def _partition_key(subject: str, chapter_name: str):
+    return hashlib.sha1(f"{subject}\0{chapter_name}".encode("utf-8")).hexdigest()[:16]
+
+
+def _partition_files(collection_name: str, key: str, version: int):
+    base = os.path.join(_collection_dir(collection_name), f"{key}.{version}")
+    return base + ".npy", base + ".json"
+
+
+# --------------------------------------------------
+# FILE STORAGE
+# --------------------------------------------------
+
+def _read_manifest(collection_name: str):
+    path = _manifest_path(collection_name)
+    if not os.path.exists(path):
+        raise Exception(f"Local collection not found: {collection_name}")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(collection_name: str, manifest: dict):
+    path = _manifest_path(collection_name)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _read_partition(collection_name: str, key: str, entry: dict, mmap: bool = True):
+    vectors_path, payloads_path = _partition_files(collection_name, key, entry["version"])
+
+    with open(payloads_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+
+    return _Partition(
+        subject=entry["subject"],
+        chapter_name=entry["chapter_name"],
+        version=entry["version"],
+        ids=[record["id"] for record in records],
+        payloads=[record["payload"] for record in records],
+        vectors=np.load(vectors_path, mmap_mode="r" if mmap else None)
+    )
+
+
+def _retire(collection_name: str, manifest: dict, paths: list):
+
+    now = time.time()
+    retired = manifest.setdefault("retired", [])
+    retired.extend({"file": os.path.basename(path), "retired_at": now} for path in paths)
+
+    # Files retired long enough ago are no longer referenced by any reader
+    keep = []
+    for entry in retired:
+        if now - entry["retired_at"] < LOCAL_INDEX_RETIRE_SECONDS:
+            keep.append(entry)
+            continue
+        path = os.path.join(_collection_dir(collection_name), entry["file"])
+        if os.path.exists(path):
+            os.remove(path)
+    manifest["retired"] = keep
+
+
+def _write_partition(collection_name: str, manifest: dict, subject: str, chapter_name: str, ids, payloads, vectors):
+
+    key = _partition_key(subject, chapter_name)
+    previous = manifest["partitions"].get(key)
+
+    if not ids:
+        manifest["partitions"].pop(key, None)
+    else:
+        # A removed-then-recreated partition must not reuse a retired file name
+        retired = [
+            int(entry["file"].split(".")[1]) for entry in manifest.get("retired", [])
+            if entry["file"].startswith(key + ".")
+        ]
+        version = max([previous["version"] if previous else 0] + retired) + 1
+        vectors_path, payloads_path = _partition_files(collection_name, key, version)
+
+        np.save(vectors_path, np.ascontiguousarray(vectors, dtype=np.float32))
+        with open(payloads_path, "w", encoding="utf-8") as f:
+            json.dump([{"id": pid, "payload": payload} for pid, payload in zip(ids, payloads)], f)
+
+        manifest["partitions"][key] = {
+            "subject": subject,
+            "chapter_name": chapter_name,
+            "count": len(ids),
+            "version": version
+        }
+
+    _retire(
+        collection_name, manifest,
+        list(_partition_files(collection_name, key, previous["version"])) if previous else []
+    )
+
+    _write_manifest(collection_name, manifest)
+
+
+# --------------------------------------------------
+# IN-MEMORY CACHE
+# --------------------------------------------------
+
+def _load(collection_name: str):
+
+    try:
+        # Manifests are replaced, never edited, so the inode changes too
+        stat = os.stat(_manifest_path(collection_name))
+        mtime = (stat.st_ino, stat.st_mtime_ns)
+    except FileNotFoundError:
+        raise Exception(f"Local collection not found: {collection_name}")
+
+    cached = _collections.get(collection_name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _lock:
+        cached = _collections.get(collection_name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        previous = cached[1] if cached else {}
+
+        for attempt in range(3):
+            manifest = _read_manifest(collection_name)
+            try:
+                partitions = {}
+                for key, entry in manifest["partitions"].items():
+                    old = previous.get(key)
+                    if old is not None and old.version == entry["version"]:
+                        partitions[key] = old
+                    else:
+                        partitions[key] = _read_partition(collection_name, key, entry)
+                break
+            except FileNotFoundError:
+                # A writer replaced the manifest between our read and open
+                if attempt == 2:
+                    raise
+                stat = os.stat(_manifest_path(collection_name))
+                mtime = (stat.st_ino, stat.st_mtime_ns)
+
+        _collections[collection_name] = (mtime, partitions)
+
+    return partitions
+
+
+def list_collections():
+    if not os.path.isdir(LOCAL_INDEX_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(LOCAL_INDEX_DIR)
+        if os.path.exists(_manifest_path(name))
+    )
+
+
+def warm():
+    for collection_name in list_collections():
+        _load(collection_name)
+
+
+def chapter_counts(collection_name: str):
+    counts = {}
+    for partition in _load(collection_name).values():
+        counts.setdefault(partition.subject, {})[partition.chapter_name] = len(partition.ids)
+    return counts
+
+
+# --------------------------------------------------
+# CREATE COLLECTION
+# --------------------------------------------------
+
+def create_collection(collection_name: str, vector_size: int = 384, profile: str = None):
+
+    # profile only applies to Qdrant; accepted so callers need not care
+    os.makedirs(_collection_dir(collection_name), exist_ok=True)
+
+    with _file_lock(_manifest_path(collection_name)):
+        if not os.path.exists(_manifest_path(collection_name)):
+            _write_manifest(collection_name, {"vector_size": vector_size, "partitions": {}})
+
+
+# --------------------------------------------------
+# UPSERT POINTS
+# --------------------------------------------------
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+def upsert_points(collection_name: str, points: list, wait: bool = True):
+
+    new_vectors = _normalize([point.vector for point in points]) if points else []
+
+    with _pending_lock:
+        for point, vector in zip(points, new_vectors):
+            payload = point.payload or {}
+            subject, chapter_name = payload.get("subject"), payload.get("chapter_name")
+            staged = _pending.setdefault(
+                (collection_name, _partition_key(subject, chapter_name)),
+                {"subject": subject, "chapter_name": chapter_name, "points": {}}
+            )
+            staged["points"][str(point.id)] = (point.payload, vector)
+
+
+def _take_pending(collection_name: str, key: str = None):
+    with _pending_lock:
+        taken = {
+            staged_key[1]: _pending.pop(staged_key)
+            for staged_key in list(_pending)
+            if staged_key[0] == collection_name and (key is None or staged_key[1] == key)
+        }
+    return taken
+
+
+def _merge_partition(collection_name: str, manifest: dict, key: str, subject: str, chapter_name: str, staged: dict = None, keep: set = None):
+
+    # Current partition + buffered points, minus anything not in keep; one write
+    entry = manifest["partitions"].get(key)
+
+    if entry:
+        current = _read_partition(collection_name, key, entry, mmap=False)
+        ids, payloads, vectors = list(current.ids), list(current.payloads), list(current.vectors)
+        rows = dict(current.rows)
+    else:
+        ids, payloads, vectors, rows = [], [], [], {}
+
+    for pid, (payload, vector) in (staged or {}).items():
+        if pid in rows:
+            payloads[rows[pid]] = payload
+            vectors[rows[pid]] = vector
+        else:
+            rows[pid] = len(ids)
+            ids.append(pid)
+            payloads.append(payload)
+            vectors.append(vector)
+
+    removed = 0
+    if keep is not None:
+        kept = [row for row, pid in enumerate(ids) if pid in keep]
+        removed = len(ids) - len(kept)
+        ids = [ids[row] for row in kept]
+        payloads = [payloads[row] for row in kept]
+        vectors = [vectors[row] for row in kept]
+
+    if staged or removed:
+        _write_partition(
+            collection_name, manifest, subject, chapter_name,
+            ids, payloads, np.vstack(vectors) if vectors else None
+        )
+
+    return removed
+
+
+def flush_points(collection_name: str):
+
+    # Writes every partition with buffered points, once each
+    staged = _take_pending(collection_name)
+    if not staged:
+        return
+
+    with _file_lock(_manifest_path(collection_name)):
+        manifest = _read_manifest(collection_name)
+        for key, entry in staged.items():
+            _merge_partition(
+                collection_name, manifest, key,
+                entry["subject"], entry["chapter_name"], entry["points"]
+            )
+
+
+# --------------------------------------------------
+# EXISTING POINT IDS
+# --------------------------------------------------
+
+def existing_point_ids(collection_name: str, ids: list):
+
+    partitions = _load(collection_name).values()
+
+    with _pending_lock:
+        staged = [
+            entry["points"] for (name, _), entry in _pending.items()
+            if name == collection_name
+        ]
+
+    return {
+        str(pid) for pid in ids
+        if any(str(pid) in partition.rows for partition in partitions)
+        or any(str(pid) in points for points in staged)
+    }
+
+
+# --------------------------------------------------
+# DELETE STALE CHAPTER POINTS
+# --------------------------------------------------
+
+def delete_stale_chapter_points(
+    collection_name: str,
+    *,
+    subject: str,
+    chapter_name: str,
+    keep_ids: list
+):
+
+    # Also writes the chapter's buffered points, in the same single pass
+    subject, chapter_name = subject.lower(), chapter_name.lower()
+    key = _partition_key(subject, chapter_name)
+    staged = _take_pending(collection_name, key).get(key)
+
+    with _file_lock(_manifest_path(collection_name)):
+
+        manifest = _read_manifest(collection_name)
+
+        if not staged and key not in manifest["partitions"]:
+            return 0
+
+        return _merge_partition(
+            collection_name, manifest, key, subject, chapter_name,
+            staged["points"] if staged else None,
+            keep={str(pid) for pid in keep_ids}
+        )
+
+
+# --------------------------------------------------
+# COUNT CHAPTER POINTS
+# --------------------------------------------------
+
+def count_chapter_points(collection_name: str, *, subject: str, chapter_name: str):
+
+    partition = _load(collection_name).get(_partition_key(subject.lower(), chapter_name.lower()))
+
+    return len(partition.ids) if partition else 0
+
+
+# --------------------------------------------------
+# SEARCH SIMILAR
+# --------------------------------------------------
+
+def search_similar(
+    *,
+    grade: int,
+    subject: str,
+    query_vector: list,
+    chapter_name: str = None,
+    limit: int = 3,
+    fields: tuple = ("content",),
+    score_threshold: float = SEARCH_SCORE_THRESHOLD
+):
+
+    from app.vectorstore.qdrant_client import SearchHit
+
+    collection_name = f"olympiad_grade_{grade}"
+    partitions = _load(collection_name)
+
+    subject = subject.lower()
+    if chapter_name:
+        partition = partitions.get(_partition_key(subject, chapter_name.lower()))
+        selected = [partition] if partition else []
+    else:
+        selected = [p for p in partitions.values() if p.subject == subject]
+
+    if not selected or limit <= 0:
+        return []
+
+    query = _normalize(query_vector)
+
+    # Cosine similarity is a dot product on normalized vectors
+    scores = np.concatenate([partition.vectors @ query for partition in selected])
+    owners = np.repeat(np.arange(len(selected)), [len(p.ids) for p in selected])
+    offsets = np.cumsum([0] + [len(p.ids) for p in selected])
+
+    if limit < len(scores):
+        top = np.argpartition(-scores, limit)[:limit]
+    else:
+        top = np.arange(len(scores))
+    top = top[np.argsort(-scores[top])]
+
+    hits = []
+    for index in top:
+        score = float(scores[index])
+        if score_threshold is not None and score < score_threshold:
+            break
+
+        partition = selected[owners[index]]
+        row = index - offsets[owners[index]]
+
+        payload = {k: partition.payloads[row][k] for k in fields if k in partition.payloads[row]}
+        content = payload.pop("content", "")
+
+        hits.append(SearchHit(
+            score=score,
+            id=partition.ids[row],
+            content=content,
+            payload=payload or None
+        ))
+
+    return hits
+
+
+# --------------------------------------------------
+# BULK LOAD / EXPORT (snapshots)
+# --------------------------------------------------
+
+def bulk_load(collection_name: str, ids: list, payloads: list, vectors):
+
+    # Writes each partition once from numpy slices instead of point objects
+    groups = {}
+    for row, payload in enumerate(payloads):
+        groups.setdefault((payload.get("subject"), payload.get("chapter_name")), []).append(row)
+
+    with _file_lock(_manifest_path(collection_name)):
+
+        manifest = _read_manifest(collection_name)
+
+        for (subject, chapter_name), rows in groups.items():
+            _write_partition(
+                collection_name, manifest, subject, chapter_name,
+                [str(ids[row]) for row in rows],
+                [payloads[row] for row in rows],
+                _normalize(vectors[rows])
+            )
+
+
+def iter_partitions(collection_name: str):
+    # (ids, payloads, vectors) per (subject, chapter) partition
+    for partition in _load(collection_name).values():
+        yield partition.ids, partition.payloads, partition.vectors
@@ -0,0 +1,72 @@
+import json
+import argparse
+from app.config import QDRANT_PROFILE
+from app.vectorstore.profiles import PROFILES, get_profile, hnsw_config, quantization_config
+from app.vectorstore.qdrant_client import get_client
+
+# Applies a tuning profile to existing olympiad_grade_N collections in place.
+# Qdrant rebuilds the HNSW graph / quantized vectors in the background, so
+# the collection keeps serving searches while the optimizer runs.
+#
+#   python -m app.vectorstore.migrate --profile compact
+#   python -m app.vectorstore.migrate --profile compact --collections olympiad_grade_5 --dry-run
+
+
+def _collections(names: list = None):
+    existing = [c.name for c in get_client().get_collections().collections]
+    if names:
+        missing = set(names) - set(existing)
+        if missing:
+            raise Exception(f"Collections not found: {', '.join(sorted(missing))}")
+        return names
+    return sorted(name for name in existing if name.startswith("olympiad_grade_"))
+
+
+def apply_profile(collection_name: str, profile: str = QDRANT_PROFILE, dry_run: bool = False):
+
+    from qdrant_client.models import VectorParamsDiff, CollectionParamsDiff, Disabled
+
+    tuning = get_profile(profile)
+    client = get_client()
+
+    before = client.get_collection(collection_name)
+
+    if not dry_run:
+        client.update_collection(
+            collection_name=collection_name,
+            vectors_config={"": VectorParamsDiff(on_disk=tuning["on_disk_vectors"])},
+            hnsw_config=hnsw_config(tuning),
+            quantization_config=quantization_config(tuning) or Disabled.DISABLED,
+            collection_params=CollectionParamsDiff(on_disk_payload=tuning["on_disk_payload"])
+        )
+
+    return {
+        "collection": collection_name,
+        "profile": profile,
+        "points": before.points_count,
+        "status_before": str(before.status),
+        "applied": not dry_run
+    }
+
+
+def migrate(profile: str = QDRANT_PROFILE, collections: list = None, dry_run: bool = False):
+
+    results = []
+
+    for name in _collections(collections):
+        result = apply_profile(name, profile, dry_run)
+        results.append(result)
+        print(f"{'🔎' if dry_run else '✅'} {name}: {profile} ({result['points']} points)")
+
+    return results
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Apply a Qdrant tuning profile to existing collections")
+    parser.add_argument("--profile", default=QDRANT_PROFILE, choices=sorted(PROFILES))
+    parser.add_argument("--collections", nargs="+", help="Defaults to every olympiad_grade_N collection")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    print(json.dumps(migrate(args.profile, args.collections, args.dry_run), indent=2))
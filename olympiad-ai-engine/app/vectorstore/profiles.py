@@ -0,0 +1,115 @@
+from app.config import QDRANT_PROFILE
+
+# Collection tuning profiles, selected with QDRANT_PROFILE.
+#
+#   default  - Qdrant defaults: float32 vectors and payloads in RAM
+#   compact  - int8 scalar quantization kept in RAM, originals and payload
+#              (including the chunk text) on disk, rescored at query time
+#   binary   - 1-bit binary quantization in RAM, heavier oversampling;
+#              smallest footprint, worth checking recall on your own data
+#
+# The subject/chapter_name keyword indexes stay in RAM under every profile,
+# so filtered searches do not touch the on-disk payload.
+
+PROFILES = {
+    "default": {
+        "hnsw_m": 16,
+        "hnsw_ef_construct": 100,
+        "quantization": None,
+        "on_disk_vectors": False,
+        "on_disk_payload": False,
+        "hnsw_ef": None,
+        "rescore": False,
+        "oversampling": None
+    },
+    "compact": {
+        "hnsw_m": 16,
+        "hnsw_ef_construct": 128,
+        "quantization": "int8",
+        "on_disk_vectors": True,
+        "on_disk_payload": True,
+        "hnsw_ef": 64,
+        "rescore": True,
+        "oversampling": 2.0
+    },
+    "binary": {
+        "hnsw_m": 16,
+        "hnsw_ef_construct": 128,
+        "quantization": "binary",
+        "on_disk_vectors": True,
+        "on_disk_payload": True,
+        "hnsw_ef": 128,
+        "rescore": True,
+        "oversampling": 3.0
+    }
+}
+
+
+def get_profile(name: str = QDRANT_PROFILE):
+    if name not in PROFILES:
+        raise Exception(f"Unknown Qdrant profile: {name} (choose from {', '.join(PROFILES)})")
+    return PROFILES[name]
+
+
+# --------------------------------------------------
+# QDRANT MODEL BUILDERS
+# --------------------------------------------------
+
+def quantization_config(profile: dict):
+
+    from qdrant_client.models import (
+        ScalarQuantization,
+        ScalarQuantizationConfig,
+        ScalarType,
+        BinaryQuantization,
+        BinaryQuantizationConfig
+    )
+
+    if profile["quantization"] == "int8":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
+            )
+        )
+
+    if profile["quantization"] == "binary":
+        return BinaryQuantization(
+            binary=BinaryQuantizationConfig(always_ram=True)
+        )
+
+    if profile["quantization"] is None:
+        return None
+
+    raise Exception(f"Unknown quantization: {profile['quantization']}")
+
+
+def hnsw_config(profile: dict):
+
+    from qdrant_client.models import HnswConfigDiff
+
+    return HnswConfigDiff(
+        m=profile["hnsw_m"],
+        ef_construct=profile["hnsw_ef_construct"]
+    )
+
+
+def search_params(profile: dict):
+
+    from qdrant_client.models import SearchParams, QuantizationSearchParams
+
+    if profile["hnsw_ef"] is None and profile["quantization"] is None:
+        return None
+
+    quantization = None
+    if profile["quantization"] is not None:
+        quantization = QuantizationSearchParams(
+            rescore=profile["rescore"],
+            oversampling=profile["oversampling"]
+        )
+
+    return SearchParams(
+        hnsw_ef=profile["hnsw_ef"],
+        quantization=quantization
+    )
@@ -1,36 +1,56 @@
 import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
-from qdrant_client.models import (
-    VectorParams,
-    Distance,
-    Filter,
-    FieldCondition,
-    MatchValue
-)
+from app.config import SEARCH_SCORE_THRESHOLD, QDRANT_PROFILE, VECTOR_BACKEND
+from app.vectorstore.profiles import get_profile, hnsw_config, quantization_config, search_params
 
 load_dotenv()
 
-client = QdrantClient(
-    url=os.getenv("QDRANT_URL"),
-    api_key=os.getenv("QDRANT_API_KEY")
-)
+# qdrant_client (and grpc underneath it) is imported on first use so that
+# importing the API does not pay for it.
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from qdrant_client import QdrantClient
+                _client = QdrantClient(
+                    url=os.getenv("QDRANT_URL"),
+                    api_key=os.getenv("QDRANT_API_KEY")
+                )
+    return _client
 
 # --------------------------------------------------
 # CREATE COLLECTION
 # --------------------------------------------------
 
-def create_collection(collection_name: str, vector_size: int = 384):
+def create_collection(collection_name: str, vector_size: int = 384, profile: str = QDRANT_PROFILE):
+
+    from qdrant_client.models import VectorParams, Distance
+
+    client = get_client()
 
     existing = [c.name for c in client.get_collections().collections]
 
     if collection_name not in existing:
+        tuning = get_profile(profile)
+
         client.create_collection(
             collection_name=collection_name,
             vectors_config=VectorParams(
                 size=vector_size,
-                distance=Distance.COSINE
-            )
+                distance=Distance.COSINE,
+                on_disk=tuning["on_disk_vectors"]
+            ),
+            hnsw_config=hnsw_config(tuning),
+            quantization_config=quantization_config(tuning),
+            on_disk_payload=tuning["on_disk_payload"]
         )
 
         client.create_payload_index(
@@ -47,19 +67,137 @@ def create_collection(collection_name: str, vector_size: int = 384):
 
 
 # --------------------------------------------------
-# SEARCH SIMILAR (SAFE VERSION)
+# UPSERT POINTS
 # --------------------------------------------------
 
-def search_similar(
+def upsert_points(collection_name: str, points: list, wait: bool = True):
+
+    get_client().upsert(
+        collection_name=collection_name,
+        points=points,
+        wait=wait
+    )
+
+
+def flush_points(collection_name: str):
+    # Qdrant applies upserts as they arrive; the local index buffers them
+    pass
+
+
+# --------------------------------------------------
+# EXISTING POINT IDS
+# --------------------------------------------------
+
+def existing_point_ids(collection_name: str, ids: list):
+
+    if not ids:
+        return set()
+
+    points = get_client().retrieve(
+        collection_name=collection_name,
+        ids=ids,
+        with_payload=False,
+        with_vectors=False
+    )
+
+    return {str(point.id) for point in points}
+
+
+# --------------------------------------------------
+# DELETE STALE CHAPTER POINTS
+# --------------------------------------------------
+
+def delete_stale_chapter_points(
+    collection_name: str,
     *,
-    grade: int,
     subject: str,
-    query_vector: list,
-    chapter_name: str = None,
-    limit: int = 3
+    chapter_name: str,
+    keep_ids: list
 ):
 
-    collection_name = f"olympiad_grade_{grade}"
+    from qdrant_client.models import (
+        Filter,
+        FieldCondition,
+        MatchValue,
+        HasIdCondition,
+        FilterSelector
+    )
+
+    client = get_client()
+
+    must_not = [HasIdCondition(has_id=keep_ids)] if keep_ids else []
+
+    stale_filter = Filter(
+        must=[
+            FieldCondition(key="subject", match=MatchValue(value=subject.lower())),
+            FieldCondition(key="chapter_name", match=MatchValue(value=chapter_name.lower()))
+        ],
+        must_not=must_not
+    )
+
+    stale = client.count(
+        collection_name=collection_name,
+        count_filter=stale_filter,
+        exact=True
+    ).count
+
+    if stale:
+        client.delete(
+            collection_name=collection_name,
+            points_selector=FilterSelector(filter=stale_filter),
+            wait=True
+        )
+
+    return stale
+
+
+# --------------------------------------------------
+# COUNT CHAPTER POINTS
+# --------------------------------------------------
+
+def count_chapter_points(collection_name: str, *, subject: str, chapter_name: str):
+
+    from qdrant_client.models import Filter, FieldCondition, MatchValue
+
+    return get_client().count(
+        collection_name=collection_name,
+        count_filter=Filter(
+            must=[
+                FieldCondition(key="subject", match=MatchValue(value=subject.lower())),
+                FieldCondition(key="chapter_name", match=MatchValue(value=chapter_name.lower()))
+            ]
+        ),
+        exact=True
+    ).count
+
+
+# --------------------------------------------------
+# SEARCH SIMILAR (SAFE VERSION)
+# --------------------------------------------------
+
+@dataclass(slots=True)
+class SearchHit:
+    score: float
+    id: str
+    content: str
+    # Any projected payload fields other than content
+    payload: dict = None
+
+
+def _to_hit(point):
+    payload = point.payload or {}
+    content = payload.pop("content", "")
+    return SearchHit(
+        score=point.score,
+        id=str(point.id),
+        content=content,
+        payload=payload or None
+    )
+
+
+def _search_filter(subject: str, chapter_name: str = None):
+
+    from qdrant_client.models import Filter, FieldCondition, MatchValue
 
     must_conditions = [
         FieldCondition(
@@ -76,13 +214,58 @@ def search_similar(
             )
         )
 
-    query_filter = Filter(must=must_conditions)
+    return Filter(must=must_conditions)
 
-    results = client.query_points(
+
+@lru_cache(maxsize=1)
+def active_search_params():
+    # hnsw_ef / quantization rescoring for the active profile
+    return search_params(get_profile())
+
+
+def search_similar(
+    *,
+    grade: int,
+    subject: str,
+    query_vector: list,
+    chapter_name: str = None,
+    limit: int = 3,
+    fields: tuple = ("content",),
+    score_threshold: float = SEARCH_SCORE_THRESHOLD
+):
+
+    collection_name = f"olympiad_grade_{grade}"
+
+    # Only the projected payload keys come back; vectors never do
+    results = get_client().query_points(
         collection_name=collection_name,
         query=query_vector,
-        query_filter=query_filter,
-        limit=limit
+        query_filter=_search_filter(subject, chapter_name),
+        limit=limit,
+        with_payload=list(fields),
+        with_vectors=False,
+        score_threshold=score_threshold,
+        search_params=active_search_params()
     )
 
-    return [point.payload for point in results.points]
\ No newline at end of file
+    return [_to_hit(point) for point in results.points]
+
+
+# --------------------------------------------------
+# LOCAL BACKEND
+# --------------------------------------------------
+
+# Snapshot import can target Qdrant whichever backend is active
+qdrant_create_collection = create_collection
+
+if VECTOR_BACKEND == "local":
+    # Same interface, served from the in-process index instead of Qdrant
+    from app.vectorstore.local_index import (  # noqa: F811
+        create_collection,
+        upsert_points,
+        flush_points,
+        existing_point_ids,
+        delete_stale_chapter_points,
+        count_chapter_points,
+        search_similar
+    )
@@ -0,0 +1,200 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from app.config import (
+    RETRIEVAL_CACHE_SIZE,
+    RETRIEVAL_CACHE_MAX_BYTES,
+    RETRIEVAL_CACHE_TTL_SECONDS,
+    SEARCH_SCORE_THRESHOLD
+)
+from app.vectorstore.catalog import grade_generation, grade_generation_async
+
+# Caches search_similar results per (grade, subject, chapter, query vector
+# hash, limit, fields, threshold). Each entry remembers the grade's catalog
+# generation when it was stored; ingestion bumps that generation, so entries
+# for a re-ingested grade are dropped on their next lookup.
+
+
+def query_hash(query_vector):
+    vector = np.asarray(query_vector, dtype=np.float32)
+    return hashlib.blake2b(vector.tobytes(), digest_size=16).hexdigest()
+
+
+def _hits_size(hits: list):
+    # Rough bytes held by an entry; content text dominates
+    return sum(len(hit.content) + 64 for hit in hits) + 128
+
+
+class RetrievalCache:
+
+    def __init__(
+        self,
+        max_entries: int = RETRIEVAL_CACHE_SIZE,
+        max_bytes: int = RETRIEVAL_CACHE_MAX_BYTES,
+        ttl_seconds: float = RETRIEVAL_CACHE_TTL_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[3]
+
+    def get(self, key: tuple, generation: int):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                hits, entry_generation, expires_at, _ = entry
+
+                if entry_generation != generation:
+                    self._drop(key)
+                    self.invalidations += 1
+                elif expires_at is not None and expires_at <= time.monotonic():
+                    self._drop(key)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(hits)
+
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, generation: int, hits: list):
+        if self.max_entries <= 0:
+            return
+
+        size = _hits_size(hits)
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+            self._entries[key] = (tuple(hits), generation, expires_at, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_cache = RetrievalCache()
+
+
+def _cache_key(grade, subject, chapter_name, query_vector, limit, fields, score_threshold):
+    return (
+        int(grade),
+        subject.lower(),
+        (chapter_name or "").lower(),
+        query_hash(query_vector),
+        limit,
+        tuple(fields),
+        score_threshold
+    )
+
+
+# --------------------------------------------------
+# CACHED SEARCH
+# --------------------------------------------------
+
+def search_similar_cached(
+    *,
+    grade: int,
+    subject: str,
+    query_vector: list,
+    chapter_name: str = None,
+    limit: int = 3,
+    fields: tuple = ("content",),
+    score_threshold: float = SEARCH_SCORE_THRESHOLD
+):
+
+    from app.vectorstore.qdrant_client import search_similar
+
+    key = _cache_key(grade, subject, chapter_name, query_vector, limit, fields, score_threshold)
+    generation = grade_generation(grade)
+
+    hits = _cache.get(key, generation)
+    if hits is None:
+        hits = search_similar(
+            grade=grade,
+            subject=subject,
+            query_vector=query_vector,
+            chapter_name=chapter_name,
+            limit=limit,
+            fields=fields,
+            score_threshold=score_threshold
+        )
+        _cache.put(key, generation, hits)
+
+    return hits
+
+
+async def search_similar_cached_async(
+    *,
+    grade: int,
+    subject: str,
+    query_vector: list,
+    chapter_name: str = None,
+    limit: int = 3,
+    fields: tuple = ("content",),
+    score_threshold: float = SEARCH_SCORE_THRESHOLD
+):
+
+    from app.vectorstore.async_qdrant_client import search_similar_async
+
+    key = _cache_key(grade, subject, chapter_name, query_vector, limit, fields, score_threshold)
+    generation = await grade_generation_async(grade)
+
+    hits = _cache.get(key, generation)
+    if hits is None:
+        hits = await search_similar_async(
+            grade=grade,
+            subject=subject,
+            query_vector=query_vector,
+            chapter_name=chapter_name,
+            limit=limit,
+            fields=fields,
+            score_threshold=score_threshold
+        )
+        _cache.put(key, generation, hits)
+
+    return hits
+
+
+def retrieval_cache_stats():
+    return _cache.stats()
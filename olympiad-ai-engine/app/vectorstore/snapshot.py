@@ -0,0 +1,259 @@
+import os
+import json
+import gzip
+import time
+import argparse
+import numpy as np
+from app.config import (
+    VECTOR_BACKEND,
+    EMBEDDING_MODEL,
+    SNAPSHOT_DIR,
+    SNAPSHOT_BATCH_SIZE,
+    SNAPSHOT_UPLOAD_WORKERS
+)
+
+# Embedding snapshots: bootstrap an environment from another one's vectors
+# instead of re-extracting and re-embedding every PDF.
+#
+#   snapshots/olympiad_grade_5/
+#       meta.json          collection, count, vector_size, embedding_model
+#       vectors.npy        float32 [count, vector_size]
+#       payloads.json.gz   {"ids": [...], "columns": {"subject": [...], ...}}
+#
+# Row i of vectors.npy belongs to ids[i] and columns[*][i].
+#
+#   python -m app.vectorstore.snapshot export --out data/snapshots
+#   python -m app.vectorstore.snapshot import --snapshot data/snapshots --target local
+
+
+def _snapshot_paths(snapshot_dir: str):
+    return (
+        os.path.join(snapshot_dir, "meta.json"),
+        os.path.join(snapshot_dir, "vectors.npy"),
+        os.path.join(snapshot_dir, "payloads.json.gz")
+    )
+
+
+def _to_columns(payloads: list):
+    keys = sorted({key for payload in payloads for key in payload})
+    return {key: [payload.get(key) for payload in payloads] for key in keys}
+
+
+def _from_columns(columns: dict, count: int):
+    return [
+        {key: values[row] for key, values in columns.items() if values[row] is not None}
+        for row in range(count)
+    ]
+
+
+# --------------------------------------------------
+# EXPORT
+# --------------------------------------------------
+
+def _iter_qdrant(collection_name: str, page_size: int):
+
+    from app.vectorstore.qdrant_client import get_client
+
+    client = get_client()
+    offset = None
+
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=page_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+
+        if points:
+            yield (
+                [str(point.id) for point in points],
+                [point.payload or {} for point in points],
+                np.asarray([point.vector for point in points], dtype=np.float32)
+            )
+
+        if offset is None:
+            break
+
+
+def _iter_local(collection_name: str):
+    from app.vectorstore.local_index import iter_partitions
+    yield from iter_partitions(collection_name)
+
+
+def export_snapshot(
+    collection_name: str,
+    snapshot_dir: str,
+    source: str = VECTOR_BACKEND,
+    page_size: int = SNAPSHOT_BATCH_SIZE
+):
+
+    started = time.perf_counter()
+    os.makedirs(snapshot_dir, exist_ok=True)
+    meta_path, vectors_path, payloads_path = _snapshot_paths(snapshot_dir)
+
+    if source == "local":
+        batches = _iter_local(collection_name)
+    else:
+        batches = _iter_qdrant(collection_name, page_size)
+
+    ids, payloads, vector_parts = [], [], []
+
+    for batch_ids, batch_payloads, batch_vectors in batches:
+        ids.extend(batch_ids)
+        payloads.extend(batch_payloads)
+        vector_parts.append(np.asarray(batch_vectors, dtype=np.float32))
+
+    vectors = np.vstack(vector_parts) if vector_parts else np.zeros((0, 384), dtype=np.float32)
+
+    np.save(vectors_path, vectors)
+
+    with gzip.open(payloads_path, "wt", encoding="utf-8") as f:
+        json.dump({"ids": ids, "columns": _to_columns(payloads)}, f)
+
+    meta = {
+        "collection": collection_name,
+        "count": len(ids),
+        "vector_size": int(vectors.shape[1]),
+        "embedding_model": EMBEDDING_MODEL,
+        "source": source,
+        "created_at": time.time()
+    }
+
+    # meta.json last: a snapshot without it is incomplete
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"✅ Exported {collection_name}: {len(ids)} points in {time.perf_counter() - started:.1f}s")
+
+    return meta
+
+
+def export_all(out_dir: str = SNAPSHOT_DIR, source: str = VECTOR_BACKEND, collections: list = None):
+
+    if collections is None:
+        if source == "local":
+            from app.vectorstore.local_index import list_collections
+            names = list_collections()
+        else:
+            from app.vectorstore.qdrant_client import get_client
+            names = [c.name for c in get_client().get_collections().collections]
+        collections = sorted(name for name in names if name.startswith("olympiad_grade_"))
+
+    return [
+        export_snapshot(name, os.path.join(out_dir, name), source)
+        for name in collections
+    ]
+
+
+# --------------------------------------------------
+# IMPORT
+# --------------------------------------------------
+
+def load_snapshot(snapshot_dir: str):
+
+    meta_path, vectors_path, payloads_path = _snapshot_paths(snapshot_dir)
+
+    if not os.path.exists(meta_path):
+        raise Exception(f"Incomplete snapshot (no meta.json): {snapshot_dir}")
+
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    with gzip.open(payloads_path, "rt", encoding="utf-8") as f:
+        table = json.load(f)
+
+    vectors = np.load(vectors_path, mmap_mode="r")
+
+    if len(table["ids"]) != vectors.shape[0]:
+        raise Exception(f"Snapshot rows do not match: {len(table['ids'])} ids, {vectors.shape[0]} vectors")
+
+    return meta, table["ids"], _from_columns(table["columns"], len(table["ids"])), vectors
+
+
+def import_snapshot(
+    snapshot_dir: str,
+    collection_name: str = None,
+    target: str = VECTOR_BACKEND,
+    batch_size: int = SNAPSHOT_BATCH_SIZE,
+    workers: int = SNAPSHOT_UPLOAD_WORKERS
+):
+
+    started = time.perf_counter()
+    meta, ids, payloads, vectors = load_snapshot(snapshot_dir)
+    collection_name = collection_name or meta["collection"]
+
+    if meta["embedding_model"] != EMBEDDING_MODEL:
+        # Query vectors would come from a different model than the stored ones
+        raise Exception(
+            f"Snapshot was embedded with {meta['embedding_model']}, "
+            f"this environment uses {EMBEDDING_MODEL}"
+        )
+
+    if target == "local":
+        from app.vectorstore import local_index
+        local_index.create_collection(collection_name, vector_size=meta["vector_size"])
+        local_index.bulk_load(collection_name, ids, payloads, vectors)
+    else:
+        from app.vectorstore.qdrant_client import get_client, qdrant_create_collection
+        qdrant_create_collection(collection_name, vector_size=meta["vector_size"])
+        get_client().upload_collection(
+            collection_name=collection_name,
+            vectors=vectors,
+            payload=payloads,
+            ids=ids,
+            batch_size=batch_size,
+            parallel=workers,
+            wait=True
+        )
+
+    seconds = time.perf_counter() - started
+    print(f"✅ Imported {collection_name} into {target}: {len(ids)} points in {seconds:.1f}s")
+
+    return {"collection": collection_name, "target": target, "points": len(ids), "seconds": round(seconds, 2)}
+
+
+def import_all(snapshot_root: str = SNAPSHOT_DIR, target: str = VECTOR_BACKEND):
+
+    from app.vectorstore.catalog import rebuild_catalog
+
+    if os.path.exists(_snapshot_paths(snapshot_root)[0]):
+        snapshot_dirs = [snapshot_root]
+    else:
+        snapshot_dirs = sorted(
+            os.path.join(snapshot_root, name) for name in os.listdir(snapshot_root)
+            if os.path.exists(_snapshot_paths(os.path.join(snapshot_root, name))[0])
+        )
+
+    results = [import_snapshot(snapshot_dir, target=target) for snapshot_dir in snapshot_dirs]
+
+    # Chapters arrived without going through ingestion
+    if target == VECTOR_BACKEND:
+        rebuild_catalog()
+
+    return results
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Export / import embedding snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export")
+    export_parser.add_argument("--out", default=SNAPSHOT_DIR)
+    export_parser.add_argument("--source", default=VECTOR_BACKEND, choices=["qdrant", "local"])
+    export_parser.add_argument("--collections", nargs="+", help="Defaults to every olympiad_grade_N collection")
+
+    import_parser = commands.add_parser("import")
+    import_parser.add_argument("--snapshot", default=SNAPSHOT_DIR, help="One snapshot or a directory of them")
+    import_parser.add_argument("--target", default=VECTOR_BACKEND, choices=["qdrant", "local"])
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        results = export_all(args.out, args.source, args.collections)
+    else:
+        results = import_all(args.snapshot, args.target)
+
+    print(json.dumps(results, indent=2))
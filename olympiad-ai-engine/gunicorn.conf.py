@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import subprocess
+
+# When EMBEDDING_SOCKET is set, the master starts one shared embedding
+# server before forking workers, and every worker embeds through it
+# instead of loading its own copy of the model.
+#
+# Ingestion jobs default to the external runner here: the master starts
+# one `python -m app.services.ingest_jobs` process, so PDF extraction and
+# embedding never run inside the workers serving /ask. Set
+# INGEST_JOB_RUNNER=inline to run jobs in the workers instead.
+#
+#   EMBEDDING_SOCKET=/tmp/olympiad-embed.sock gunicorn app.main:app -k uvicorn.workers.UvicornWorker -w 8
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+
+os.environ.setdefault("INGEST_JOB_RUNNER", "external")
+
+_embedding_server = None
+_ingest_runner = None
+
+
+def on_starting(server):
+    global _embedding_server
+
+    socket_path = os.getenv("EMBEDDING_SOCKET")
+    if not socket_path:
+        return
+
+    # A stale socket would make the readiness wait below pass too early
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    _embedding_server = subprocess.Popen(
+        [sys.executable, "-m", "app.embeddings.server", "--socket", socket_path]
+    )
+
+    # Wait for the model to load so the first requests do not fail
+    deadline = time.time() + float(os.getenv("EMBEDDING_SERVER_START_TIMEOUT", "120"))
+    while not os.path.exists(socket_path):
+        if _embedding_server.poll() is not None:
+            raise RuntimeError("Embedding server exited during startup")
+        if time.time() > deadline:
+            raise RuntimeError("Embedding server did not start in time")
+        time.sleep(0.2)
+
+    server.log.info("Embedding server ready on %s", socket_path)
+
+
+def when_ready(server):
+    global _ingest_runner
+
+    # After on_starting, so the runner embeds through the shared server too
+    if os.environ["INGEST_JOB_RUNNER"].lower() == "external":
+        _ingest_runner = subprocess.Popen([sys.executable, "-m", "app.services.ingest_jobs"])
+        server.log.info("Ingest job runner started (pid %s)", _ingest_runner.pid)
+
+
+def on_exit(server):
+    for process in (_ingest_runner, _embedding_server):
+        if process is not None and process.poll() is None:
+            process.terminate()
+            process.wait(timeout=10)
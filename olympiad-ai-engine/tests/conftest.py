@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+# Set before any app module reads app.config: offline LLM and vector store,
+# and runtime files under a throwaway directory instead of data/
+_data_dir = tempfile.mkdtemp(prefix="olympiad-tests-")
+
+os.environ.update({
+    "LLM_TRANSPORT": "local",
+    "VECTOR_BACKEND": "local",
+    "WARMUP_ENABLED": "false",
+    "LOCAL_INDEX_DIR": os.path.join(_data_dir, "local_index"),
+    "CATALOG_PATH": os.path.join(_data_dir, "catalog.json"),
+    "QUESTION_BANK_PATH": os.path.join(_data_dir, "question_bank.sqlite"),
+    "INGEST_JOB_DB_PATH": os.path.join(_data_dir, "ingest_jobs.sqlite"),
+    "EXTRACTION_CACHE_PATH": os.path.join(_data_dir, "extraction_cache.sqlite"),
+    "INGEST_UPLOAD_DIR": os.path.join(_data_dir, "uploads")
+})
@@ -0,0 +1,70 @@
+import numpy as np
+
+from app.services.answer_cache import SemanticAnswerCache, question_signature
+
+
+def _vector(seed, dim=8):
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def _near(vector, seed=99, noise=0.01):
+    # Cosine well above the 0.95 threshold, like MiniLM on one-digit edits
+    return vector + noise * _vector(seed, len(vector))
+
+
+def _cache():
+    return SemanticAnswerCache(threshold=0.95, ttl_seconds=0, bucket_size=16, max_buckets=4)
+
+
+def test_question_signature_keeps_numbers_and_variables_in_order():
+    assert question_signature("What is 12×15?") == ("12", "15")
+    assert question_signature("Find x if 2x + 3 = 7") == ("x", "2", "x", "3", "7")
+    assert question_signature("Cost is 1,000.50 rupees") == ("1000.5",)
+    assert question_signature("What is photosynthesis?") == ()
+
+
+def test_questions_differing_only_in_numbers_do_not_share_answers():
+    cache = _cache()
+    vector = _vector(1)
+    cache.store(5, "maths", "multiplication", "What is 12×15?", vector, 1, "180")
+
+    assert cache.lookup(5, "maths", "multiplication", "What is 12×16?", _near(vector), 1) is None
+    assert cache.lookup(5, "maths", "multiplication", "What is 12×15 ?", _near(vector), 1)["answer"] == "180"
+
+
+def test_numeric_variants_are_cached_side_by_side():
+    cache = _cache()
+    vector = _vector(2)
+    cache.store(5, "maths", "circles", "Area of a circle of radius 7 cm", vector, 1, "154 sq cm")
+    cache.store(5, "maths", "circles", "Area of a circle of radius 14 cm", _near(vector), 1, "616 sq cm")
+
+    assert cache.lookup(5, "maths", "circles", "area of a circle of radius 14 cm", vector, 1)["answer"] == "616 sq cm"
+    assert cache.lookup(5, "maths", "circles", "area of a circle of radius 7 cm", vector, 1)["answer"] == "154 sq cm"
+
+
+def test_variable_names_must_match():
+    cache = _cache()
+    vector = _vector(3)
+    cache.store(6, "maths", "algebra", "Solve for x: 2x + 3 = 7", vector, 1, "x = 2")
+
+    assert cache.lookup(6, "maths", "algebra", "Solve for y: 2y + 3 = 7", _near(vector), 1) is None
+
+
+def test_generation_change_empties_the_bucket():
+    cache = _cache()
+    vector = _vector(4)
+    cache.store(5, "science", "plants", "What is photosynthesis?", vector, 1, "answer")
+
+    assert cache.lookup(5, "science", "plants", "What is photosynthesis?", vector, 2) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_answer_generated_before_an_ingest_is_not_stored():
+    cache = _cache()
+    vector = _vector(5)
+    # An ingest bumped the grade to generation 2 while this answer was generated
+    cache.store(5, "science", "plants", "What is a leaf?", vector, 2, "fresh")
+    cache.store(5, "science", "plants", "What is a root?", _vector(6), 1, "stale")
+
+    assert cache.lookup(5, "science", "plants", "What is a root?", _vector(6), 2) is None
+    assert cache.lookup(5, "science", "plants", "What is a leaf?", vector, 2)["answer"] == "fresh"
@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from app.services import gemini_pdf_loader
+
+LONG_TEXT = "Fractions describe equal parts of a whole and are written as a over b."
+
+
+def _write_pdf(path, pages):
+    # None -> blank page, "text" -> one line of text, ("image", "text") ->
+    # a small image (a scanned figure) plus one line of text
+    pdf = canvas.Canvas(str(path))
+    for page in pages:
+        if isinstance(page, tuple):
+            pdf.drawImage(ImageReader(Image.new("RGB", (4, 4), "red")), 72, 600, 20, 20)
+            page = page[1]
+        if page is not None:
+            pdf.drawString(72, 720, page)
+        pdf.showPage()
+    pdf.save()
+    return str(path)
+
+
+class StubFileAPI:
+
+    # Records the pages of every OCR upload; "OCRs" by echoing their text
+    def __init__(self, fail_on=(), markers=True):
+        self.fail_on = set(fail_on)
+        self.markers = markers
+        self.ranges = []
+
+    def upload_file(self, path, display_name):
+        pages = [page.extract_text().strip() for page in PdfReader(path).pages]
+        self.ranges.append(pages)
+        return SimpleNamespace(name=path, pages=pages, state=SimpleNamespace(name="ACTIVE"))
+
+    def get_file(self, name):
+        raise AssertionError("upload is already ACTIVE")
+
+    def generate_content(self, contents):
+        pages = contents[-1].pages
+        if self.fail_on & set(pages):
+            raise Exception("rate limited")
+        if not self.markers:
+            return SimpleNamespace(text="OCR[" + " ".join(pages) + "]")
+        return SimpleNamespace(text="\n".join(
+            f"=== PAGE {number} ===\nOCR[{page}]" for number, page in enumerate(pages, start=1)
+        ))
+
+
+@pytest.fixture
+def document(tmp_path):
+    return _write_pdf(
+        tmp_path / "chapter.pdf",
+        [LONG_TEXT, ("image", "p1"), ("image", "p2"), LONG_TEXT, None, ("image", "p5"), "Contents", LONG_TEXT]
+    )
+
+
+def test_low_text_pages_are_ocrd_in_ranges_and_merged_in_order(document):
+    file_api = StubFileAPI()
+
+    pages = list(gemini_pdf_loader._extract_pages(document, 1, file_api))
+
+    # Contiguous low-text pages with images share one request; the blank
+    # page and the imageless "Contents" page get none. Ranges upload
+    # concurrently, so only the set of ranges is fixed.
+    assert sorted(file_api.ranges) == [["p1", "p2"], ["p5"]]
+    assert pages == [LONG_TEXT, "OCR[p1]", "OCR[p2]", LONG_TEXT, "", "OCR[p5]", "Contents", LONG_TEXT]
+
+
+def test_ocr_output_without_page_markers_stays_page_aligned(document):
+    file_api = StubFileAPI(markers=False)
+
+    pages = list(gemini_pdf_loader._extract_pages(document, 1, file_api))
+
+    assert pages == [LONG_TEXT, "OCR[p1 p2]", "", LONG_TEXT, "", "OCR[p5]", "Contents", LONG_TEXT]
+
+
+def test_ranges_split_at_max_pages_per_request(document, monkeypatch):
+    monkeypatch.setattr(gemini_pdf_loader, "OCR_MAX_PAGES_PER_REQUEST", 1)
+    file_api = StubFileAPI()
+
+    pages = list(gemini_pdf_loader._extract_pages(document, 1, file_api))
+
+    assert sorted(file_api.ranges) == [["p1"], ["p2"], ["p5"]]
+    assert pages[1:3] == ["OCR[p1]", "OCR[p2]"]
+
+
+def test_failed_ocr_range_falls_back_to_pdfplumber_text(document):
+    file_api = StubFileAPI(fail_on={"p1"})
+
+    pages = list(gemini_pdf_loader._extract_pages(document, 1, file_api))
+
+    assert pages == [LONG_TEXT, "p1", "p2", LONG_TEXT, "", "OCR[p5]", "Contents", LONG_TEXT]
+
+
+def test_document_fails_only_when_no_page_has_text(tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+
+    # pdfplumber cannot open it and the whole-document OCR upload fails too
+    with pytest.raises(Exception, match="All extraction methods failed"):
+        list(gemini_pdf_loader._extract_pages(str(broken), 1, StubFileAPI()))
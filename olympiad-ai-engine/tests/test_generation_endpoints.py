@@ -0,0 +1,101 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.services import llm_gateway, question_bank
+
+
+@pytest.fixture
+def client(monkeypatch):
+
+    # Retrieval is not under test: no embedding model, no chapter context
+    async def embed(text):
+        return [0.0] * 384
+
+    async def search(**kwargs):
+        return []
+
+    monkeypatch.setattr(main, "generate_embedding_async", embed)
+    monkeypatch.setattr(main, "search_similar_cached_async", search)
+    monkeypatch.setattr(question_bank, "request_top_up", lambda *args: False)
+
+    return TestClient(main.app)
+
+
+def _request(chapter_name, count):
+    return {
+        "grade": 5,
+        "subject": "science",
+        "chapter_name": chapter_name,
+        "number_of_questions": count,
+        "duration_minutes": 30
+    }
+
+
+ENDPOINTS = {
+    "mock": ("/generate-mock/", {}, lambda body: body["questions"]),
+    "paper": (
+        "/generate-question-paper/",
+        {"marks_per_question": 1, "difficulty_level": "medium"},
+        lambda body: body["paper_data"]["questions"]
+    )
+}
+
+
+def _mcq(stem):
+    return {"question": stem, "options": [stem + " A", stem + " B", stem + " C", stem + " D"], "correct_answer": stem + " A"}
+
+
+def _assert_full_set(questions, count):
+    assert [q["id"] for q in questions] == list(range(1, count + 1))
+    assert len({q["question"] for q in questions}) == count
+
+
+def test_mock_endpoint_returns_every_question_under_local_transport(client):
+    response = client.post("/generate-mock/", json=_request("animals", 23))
+
+    assert response.status_code == 200
+    mock = response.json()
+    assert mock["chapter"] == "animals"
+    _assert_full_set(mock["questions"], 23)
+
+
+def test_question_paper_endpoint_returns_every_question_under_local_transport(client):
+    response = client.post(
+        "/generate-question-paper/",
+        json=dict(_request("plants", 23), marks_per_question=2, difficulty_level="easy")
+    )
+
+    assert response.status_code == 200
+    paper = response.json()["paper_data"]
+    assert (paper["chapter"], paper["marks_per_question"]) == ("plants", 2)
+    _assert_full_set(paper["questions"], 23)
+
+
+@pytest.mark.parametrize("endpoint", sorted(ENDPOINTS))
+@pytest.mark.parametrize("generated", [2, 0])
+def test_short_generation_is_filled_from_bank_then_fallback(client, monkeypatch, endpoint, generated):
+    path, extra, questions_of = ENDPOINTS[endpoint]
+    chapter = f"weather-{endpoint}-{generated}"
+    question_bank.add_questions(5, "science", chapter, [_mcq(f"Banked {i}?") for i in range(3)])
+
+    async def generate_async(prompt, **kwargs):
+        # Always the same two questions (every retry is a duplicate), or an outage
+        if not generated:
+            raise Exception("quota exceeded")
+        return llm_gateway.LocalResponse(
+            '{"questions": [' + ", ".join(json.dumps(_mcq(f"Generated {i}?")) for i in range(generated)) + "]}"
+        )
+
+    monkeypatch.setattr(llm_gateway, "generate_async", generate_async)
+
+    response = client.post(path, json=dict(_request(chapter, 8), **extra))
+
+    assert response.status_code == 200
+    questions = questions_of(response.json())
+    assert [q["id"] for q in questions] == list(range(1, 9))
+    stems = [q["question"] for q in questions]
+    assert stems[:generated] == [f"Generated {i}?" for i in range(generated)]
+    assert sorted(stems[generated:generated + 3]) == [f"Banked {i}?" for i in range(3)]
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.services.sharded_generation import IncompleteGeneration, generate_sharded_async
+
+
+def _generate(generate_shard, *args, **kwargs):
+    # Runs a plain shard function through the async sharding path
+    async def shard(context, count):
+        return generate_shard(context, count)
+    return asyncio.run(generate_sharded_async(shard, *args, **kwargs))
+
+
+def _shard(grade):
+    # Echoes whatever grade the model got wrong, numbered per call
+    calls = []
+
+    def generate_shard(context, count):
+        calls.append(count)
+        start = sum(calls[:-1])
+        return {
+            "grade": grade,
+            "questions": [{"question": f"Question {start + i}?"} for i in range(count)]
+        }
+
+    return generate_shard
+
+
+def test_request_fields_override_shard_output():
+    result = _generate(
+        _shard(grade=99),
+        25,
+        "context",
+        shard_size=10,
+        fields={"grade": 5, "chapter": "animals"}
+    )
+
+    assert result["grade"] == 5
+    assert result["chapter"] == "animals"
+    assert [q["id"] for q in result["questions"]] == list(range(1, 26))
+
+
+def test_shortfall_after_retries_raises_with_partial_questions():
+
+    def generate_shard(context, count):
+        # Always the same question, so every retry is a duplicate
+        return {"questions": [{"question": "Same?"}] * count}
+
+    with pytest.raises(IncompleteGeneration) as info:
+        _generate(generate_shard, 5, "context", shard_size=10, retries=1)
+
+    assert info.value.requested == 5
+    assert len(info.value.questions) == 1
+
+
+def test_non_positive_question_count_is_rejected():
+    with pytest.raises(Exception, match="must be positive"):
+        _generate(_shard(grade=5), 0, "context")